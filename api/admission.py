@@ -0,0 +1,324 @@
+"""
+Admission control and load shedding for the Flask APIs.
+
+Every endpoint gets a policy with three knobs:
+
+- max_concurrent: how many requests may run the endpoint at the same time
+- latency_target_ms: how long a request may wait for a free slot
+- priority: low / normal / high
+
+When requests to an endpoint with a higher priority wait longer than its
+target for a slot, work on lower priority endpoints is shed straight away
+instead of being queued behind it. Only the wait counts: an endpoint that
+is slow but not queuing is not short of CPU. GPT-2 generation is the only
+low priority endpoint by default, so it is the first thing dropped when
+the CPU is saturated, while the cheap template and prediction paths are
+protected.
+
+A low or normal priority endpoint that is itself queuing past its target
+also turns requests away at once instead of queuing them (counted as
+'self_shed'), but only while all its slots are busy. A request that finds
+a free slot always runs, and its short wait brings the estimate back down.
+
+Refused requests get a Retry-After of the queue delay they ran into, in
+whole seconds.
+
+Policies can be overridden with the ADMISSION_POLICIES environment variable,
+either as a JSON string or as a path to a JSON file:
+
+    ADMISSION_POLICIES='{"generate_ai": {"max_concurrent": 1}}'
+"""
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import jsonify
+
+PRIORITIES = {'low': 0, 'normal': 1, 'high': 2}
+
+DEFAULT_POLICY = {'max_concurrent': 16, 'latency_target_ms': 500, 'priority': 'normal'}
+
+DEFAULT_POLICIES = {
+    # GPT-2 is the expensive path and is shed first
+    'generate_ai': {'max_concurrent': 2, 'latency_target_ms': 2000, 'priority': 'low'},
+    'generate_smart': {'max_concurrent': 8, 'latency_target_ms': 300, 'priority': 'normal'},
+    'optimize_tweet': {'max_concurrent': 8, 'latency_target_ms': 300, 'priority': 'normal'},
+    'generate_batch': {'max_concurrent': 4, 'latency_target_ms': 1000, 'priority': 'normal'},
+    'schedule': {'max_concurrent': 4, 'latency_target_ms': 1000, 'priority': 'normal'},
+    'predict_batch': {'max_concurrent': 8, 'latency_target_ms': 500, 'priority': 'normal'},
+    # Cheap template and prediction paths are protected
+    'generate': {'max_concurrent': 32, 'latency_target_ms': 100, 'priority': 'high'},
+    'generate_branded': {'max_concurrent': 32, 'latency_target_ms': 100, 'priority': 'high'},
+    'generate_and_predict': {'max_concurrent': 32, 'latency_target_ms': 150, 'priority': 'high'},
+    'predict': {'max_concurrent': 32, 'latency_target_ms': 100, 'priority': 'high'},
+    'engagement_prior': {'max_concurrent': 32, 'latency_target_ms': 50, 'priority': 'high'},
+    'health': {'max_concurrent': 64, 'latency_target_ms': 50, 'priority': 'high'},
+}
+
+# Measurements older than this no longer count as pressure, so a single
+# slow burst does not keep low priority work shed forever.
+STALE_AFTER_SECONDS = 5.0
+
+# Longest Retry-After sent to refused clients, in seconds
+MAX_RETRY_AFTER_SECONDS = 30
+
+
+def load_policies(raw=None):
+    """
+    Merge the default policies with overrides from ADMISSION_POLICIES.
+
+    Args:
+        raw: JSON string or path to a JSON file (defaults to the env var)
+
+    Returns:
+        dict of endpoint name -> policy dict
+    """
+    if raw is None:
+        raw = os.environ.get('ADMISSION_POLICIES', '')
+
+    overrides = {}
+    if raw.strip():
+        if os.path.isfile(raw):
+            with open(raw) as f:
+                overrides = json.load(f)
+        else:
+            overrides = json.loads(raw)
+
+    policies = {name: dict(policy) for name, policy in DEFAULT_POLICIES.items()}
+    for name, policy in overrides.items():
+        merged = dict(policies.get(name, DEFAULT_POLICY))
+        merged.update(policy)
+        policies[name] = merged
+    return policies
+
+
+class _Endpoint:
+    """Slots, latency measurements and counters for one endpoint."""
+
+    def __init__(self, name, max_concurrent, latency_target_ms, priority):
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority '{priority}' for endpoint '{name}'")
+
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.target = latency_target_ms / 1000.0
+        self.priority = priority
+        self.rank = PRIORITIES[priority]
+        self.slots = threading.BoundedSemaphore(max_concurrent)
+
+        # Exponentially weighted moving averages, in seconds
+        self.queue_delay = 0.0
+        self.latency = 0.0
+        self.updated_at = 0.0
+
+        self.counters = {
+            'admitted': 0,
+            'shed': 0,
+            'self_shed': 0,
+            'rejected': 0,
+            'completed': 0,
+            'in_flight': 0,
+        }
+
+    def over_target(self, now):
+        """
+        True if recent requests waited longer than the target for a slot.
+
+        Latency is kept for monitoring only: it includes the work itself,
+        so a slow endpoint would count as overloaded even with free slots.
+        """
+        if now - self.updated_at > STALE_AFTER_SECONDS:
+            return False
+        return self.queue_delay > self.target
+
+
+class AdmissionController:
+    """
+    Per-endpoint concurrency caps with priority-based load shedding.
+
+    Use `admit(name)` as a decorator under `@app.route`. Requests that are
+    shed or cannot get a slot within the latency target get a 503 with a
+    Retry-After header.
+    """
+
+    def __init__(self, policies=None, smoothing=0.2):
+        self.smoothing = smoothing
+        self._lock = threading.Lock()
+        self._endpoints = {}
+        for name, policy in (policies or {}).items():
+            self._endpoints[name] = _Endpoint(name, **policy)
+
+    def _endpoint(self, name):
+        with self._lock:
+            if name not in self._endpoints:
+                self._endpoints[name] = _Endpoint(name, **DEFAULT_POLICY)
+            return self._endpoints[name]
+
+    def _should_shed(self, endpoint):
+        """Shed if any higher priority endpoint is queuing past its target."""
+        now = time.monotonic()
+        return any(
+            other.rank > endpoint.rank and other.over_target(now)
+            for other in list(self._endpoints.values())
+        )
+
+    def _record(self, endpoint, queue_delay, latency):
+        alpha = self.smoothing
+        with self._lock:
+            endpoint.queue_delay += alpha * (queue_delay - endpoint.queue_delay)
+            endpoint.latency += alpha * (latency - endpoint.latency)
+            endpoint.updated_at = time.monotonic()
+
+    def _count(self, endpoint, counter, delta=1):
+        with self._lock:
+            endpoint.counters[counter] += delta
+
+    def in_flight(self):
+        """Total number of requests currently running across endpoints."""
+        with self._lock:
+            return sum(e.counters['in_flight'] for e in self._endpoints.values())
+
+    def retry_after(self, name):
+        """
+        Whole seconds a refused request should wait: the smoothed queue
+        delay of the endpoint, or of the higher priority endpoint it was
+        shed for if that is longer. At least 1, at most
+        MAX_RETRY_AFTER_SECONDS.
+        """
+        endpoint = self._endpoint(name)
+        now = time.monotonic()
+        delays = [endpoint.queue_delay] + [
+            other.queue_delay for other in list(self._endpoints.values())
+            if other.rank > endpoint.rank and other.over_target(now)
+        ]
+        return min(MAX_RETRY_AFTER_SECONDS, max(1, math.ceil(max(delays))))
+
+    def _acquire(self, endpoint, timeout):
+        """
+        Take a slot, or return why the request is refused.
+
+        A free slot is taken straight away. Without one, a low or normal
+        priority endpoint that is already queuing past its target sheds
+        the request instead of adding to the queue; otherwise it waits up
+        to `timeout` seconds.
+        """
+        if self._should_shed(endpoint):
+            self._count(endpoint, 'shed')
+            return f"'{endpoint.name}' shed to protect higher priority endpoints"
+
+        waited_from = time.monotonic()
+        if not endpoint.slots.acquire(blocking=False):
+            if endpoint.rank < PRIORITIES['high'] and endpoint.over_target(waited_from):
+                self._count(endpoint, 'self_shed')
+                return f"'{endpoint.name}' is queuing past its latency target"
+
+            if timeout <= 0 or not endpoint.slots.acquire(timeout=timeout):
+                self._count(endpoint, 'rejected')
+                waited = time.monotonic() - waited_from
+                self._record(endpoint, waited, waited)
+                return f"'{endpoint.name}' is at capacity"
+
+        self._count(endpoint, 'admitted')
+        self._count(endpoint, 'in_flight')
+        return None
+
+    def _release(self, endpoint, arrived, started):
+        endpoint.slots.release()
+        self._count(endpoint, 'in_flight', -1)
+        self._count(endpoint, 'completed')
+        self._record(endpoint, started - arrived, time.monotonic() - arrived)
+
+    @contextmanager
+    def slot(self, name, timeout=None):
+        """
+        Hold one of the named endpoint's slots around a block of work.
+
+        For views that degrade instead of answering 503: the block always
+        runs and gets None if it holds a slot, or the reason it was shed
+        or rejected otherwise.
+
+        Args:
+            name: endpoint policy to take the slot from
+            timeout: longest wait for a free slot in seconds, capped at
+                the policy's latency target
+        """
+        endpoint = self._endpoint(name)
+        wait = endpoint.target if timeout is None else min(timeout, endpoint.target)
+        arrived = time.monotonic()
+        refused = self._acquire(endpoint, wait)
+        if refused:
+            yield refused
+            return
+
+        started = time.monotonic()
+        try:
+            yield None
+        finally:
+            self._release(endpoint, arrived, started)
+
+    def admit(self, name):
+        """Decorator that puts a Flask view behind the named endpoint policy."""
+        endpoint = self._endpoint(name)
+
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                arrived = time.monotonic()
+
+                refused = self._acquire(endpoint, endpoint.target)
+                if refused:
+                    return _overloaded(refused, self.retry_after(name))
+
+                started = time.monotonic()
+                try:
+                    return view(*args, **kwargs)
+                finally:
+                    self._release(endpoint, arrived, started)
+
+            return wrapper
+
+        return decorator
+
+    def stats(self):
+        """Snapshot of policies, latency estimates and counters per endpoint."""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                name: {
+                    'priority': e.priority,
+                    'max_concurrent': e.max_concurrent,
+                    'latency_target_ms': round(e.target * 1000, 1),
+                    'queue_delay_ms': round(e.queue_delay * 1000, 2),
+                    'latency_ms': round(e.latency * 1000, 2),
+                    'over_target': e.over_target(now),
+                    **e.counters,
+                }
+                for name, e in self._endpoints.items()
+            }
+
+
+def install_admission_stats(app):
+    """Expose the shared controller's counters at /admission_stats."""
+
+    @app.route('/admission_stats', methods=['GET'])
+    def admission_stats():
+        """Per-endpoint concurrency, latency and shedding counters."""
+        return jsonify(controller.stats())
+
+    return app
+
+
+def _overloaded(reason, retry_after):
+    return jsonify({
+        'error': f'Service is overloaded: {reason}. Retry later.',
+        'success': False,
+        'shed': True
+    }), 503, {'Retry-After': str(retry_after)}
+
+
+# One controller per process, shared by every API module loaded into it.
+controller = AdmissionController(load_policies())
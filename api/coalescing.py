@@ -0,0 +1,171 @@
+"""
+Single-flight coalescing of identical concurrent requests.
+
+During a campaign launch many clients send the same /optimize_tweet,
+/generate_smart, /generate_ai or /predict payload at the same moment.
+With `coalesce(name)` on a view, the first such request (the leader)
+runs the view while identical requests that arrive before it finishes
+wait and receive a copy of its response. Nothing is cached: once the
+leader's response is out, the next request computes a fresh one.
+
+Requests are identical when the endpoint, the canonical JSON body (keys
+sorted) and the query string match. Put the decorator between the route
+and `admission.admit(...)` so waiting followers don't hold admission
+slots:
+
+    @bp.route('/predict', methods=['POST'])
+    @coalescer.coalesce('predict')
+    @admission.admit('predict')
+    def predict(): ...
+
+A view that can sometimes answer from somewhere cheaper than running
+(e.g. the pre-generation pool) passes `shortcut`: it runs for every
+request before coalescing, and when it returns a response that request
+gets it alone. Only misses are coalesced.
+
+Coalesced responses carry an `X-Coalesced: 1` header, and the per-endpoint
+counters are served at /coalescing_stats.
+"""
+import hashlib
+import json
+import threading
+from functools import wraps
+
+from flask import current_app, g, jsonify, request
+
+
+def request_key(name):
+    """Canonical hash of the endpoint, JSON body and query string."""
+    body = request.get_json(silent=True)
+    canonical = json.dumps(
+        [name, body, sorted(request.args.items(multi=True))],
+        sort_keys=True, separators=(',', ':'), default=str
+    )
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class _Call:
+    """One in-flight computation and the requests waiting for it."""
+
+    __slots__ = ('done', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class Coalescer:
+    """Runs one computation per key at a time and shares its result."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._counters = {}
+
+    def _counter(self, name):
+        if name not in self._counters:
+            self._counters[name] = {'executed': 0, 'coalesced': 0, 'max_waiters': 0}
+        return self._counters[name]
+
+    def run(self, name, key, fn):
+        """
+        Call fn() unless an identical call is already running, in which
+        case wait for it and share its result (or exception).
+
+        Returns:
+            (result, shared) where shared is True for followers
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._counter(name)['executed'] += 1
+            else:
+                call.waiters += 1
+                self._counter(name)['coalesced'] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                counter = self._counter(name)
+                counter['max_waiters'] = max(counter['max_waiters'], call.waiters)
+            call.done.set()
+        return call.result, False
+
+    def coalesce(self, name, shortcut=None):
+        """
+        Decorator that shares a Flask view's response between identical concurrent requests.
+
+        Args:
+            name: endpoint name for the key and the counters
+            shortcut: optional no-argument callable tried first for every
+                request; a non-None return value is that request's response
+        """
+
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                # A profiled request has to run its own work to be measured
+                if g.get('profiler') is not None:
+                    return view(*args, **kwargs)
+
+                if shortcut is not None:
+                    response = shortcut()
+                    if response is not None:
+                        return response
+
+                def compute():
+                    response = current_app.make_response(view(*args, **kwargs))
+                    return response.get_data(), response.status_code, list(response.headers)
+
+                (body, status, headers), shared = self.run(name, request_key(name), compute)
+                response = current_app.response_class(body, status=status, headers=headers)
+                if shared:
+                    response.headers['X-Coalesced'] = '1'
+                return response
+
+            return wrapper
+
+        return decorator
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self):
+        """Per-endpoint executed / coalesced counts and the share of calls saved."""
+        with self._lock:
+            stats = {name: dict(counter) for name, counter in self._counters.items()}
+        for counter in stats.values():
+            total = counter['executed'] + counter['coalesced']
+            counter['coalesced_ratio'] = round(counter['coalesced'] / total, 3) if total else 0.0
+        return stats
+
+
+def install_coalescing_stats(app):
+    """Expose the shared coalescer's counters at /coalescing_stats."""
+
+    @app.route('/coalescing_stats', methods=['GET'])
+    def coalescing_stats():
+        """Per-endpoint counts of executed and coalesced requests."""
+        return jsonify(coalescer.stats())
+
+    return app
+
+
+# One coalescer per process, shared by every API module loaded into it.
+coalescer = Coalescer()
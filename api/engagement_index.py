@@ -0,0 +1,98 @@
+"""
+Read-only lookups into the historical engagement index.
+
+The index is built offline by `model&data/build_engagement_index.py`. The
+statistics array is memory-mapped, so loading is instant, memory is shared
+between processes and a lookup is a dict hit plus one row read.
+"""
+import json
+import os
+import re
+
+import numpy as np
+
+DAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+TERM_PATTERN = re.compile(r"#?[a-z][a-z0-9_']{2,}")
+
+
+class EngagementIndex:
+    def __init__(self, path='engagement_index'):
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+
+        self.stats = np.load(os.path.join(path, 'stats.npy'), mmap_mode='r')
+        self.columns = meta['columns']
+        self.rows = meta['rows']
+        self.overall = meta['overall']
+
+        # dimension -> key -> row in stats
+        self._rows = {
+            name: {key: dim['offset'] + i for i, key in enumerate(dim['keys'])}
+            for name, dim in meta['dimensions'].items()
+        }
+
+    @property
+    def dimensions(self):
+        return list(self._rows)
+
+    def lookup(self, dimension, key):
+        """
+        Like statistics for one key of one dimension.
+
+        Returns:
+            dict with count, median, p90 and mean, or None if the key is unknown
+        """
+        row = self._rows.get(dimension, {}).get(self._normalize(dimension, key))
+        if row is None:
+            return None
+        values = self.stats[row]
+        return {column: float(value) for column, value in zip(self.columns, values)}
+
+    def prior(self, company=None, hour=None, day_of_week=None, has_media=None, text=None):
+        """
+        Look up every provided attribute at once.
+
+        Args:
+            company: company name
+            hour: posting hour (0-23)
+            day_of_week: day name ('monday'/'mon') or number (0 = Monday)
+            has_media: whether the tweet has media
+            text: tweet text, looked up term by term
+
+        Returns:
+            dict of dimension -> stats (None for unknown keys), plus 'terms'
+            for the known hashtags/terms found in text and 'overall'
+        """
+        result = {}
+        for dimension, key in (('company', company), ('hour', hour),
+                               ('day_of_week', day_of_week), ('has_media', has_media)):
+            if key is not None:
+                result[dimension] = self.lookup(dimension, key)
+
+        if text:
+            terms = {}
+            for term in set(TERM_PATTERN.findall(text.lower())):
+                stats = self.lookup('term', term)
+                if stats is not None:
+                    terms[term] = stats
+            result['terms'] = terms
+
+        result['overall'] = self.overall
+        return result
+
+    @staticmethod
+    def _normalize(dimension, key):
+        if dimension == 'has_media':
+            if isinstance(key, str):
+                return '1' if key.strip().lower() in ('1', 'true', 'yes') else '0'
+            return '1' if key else '0'
+        if dimension == 'hour':
+            return str(int(key))
+        if dimension == 'day_of_week':
+            if isinstance(key, int) or str(key).isdigit():
+                return DAYS[int(key) % 7]
+            key = str(key).strip().lower()
+            matches = [day for day in DAYS if key and day.startswith(key[:3])]
+            return matches[0] if matches else key
+        return str(key).strip().lower()
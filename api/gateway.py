@@ -0,0 +1,66 @@
+"""
+Unified service: the generator and like predictor routes in one process.
+
+Both route sets are mounted on a single Flask app and share one like
+predictor model, one set of generator objects and one sentiment cache,
+so generate-and-predict flows never cross a process boundary. The CPU
+thread budget is applied once for the process, by whichever module
+loads first (see thread_budget.configure_threads). URLs are
+unchanged and the app listens on both of the old ports, so existing
+clients of :5000 (like predictor) and :5001 (generator) keep working.
+
+Usage:
+    python api/gateway.py                 # serves on 5000 and 5001
+    python api/gateway.py --ports 8080    # single port
+"""
+import argparse
+import logging
+import threading
+
+from flask import Flask
+from flask_cors import CORS
+from werkzeug.serving import make_server
+
+# Before the API modules load, so their startup messages (thread budget) are shown
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+
+from admission import install_admission_stats
+from coalescing import install_coalescing_stats
+from profiling import install_profiling
+from generator_api import bp as generator_bp
+from like_predictor_api import bp as like_predictor_bp
+
+app = Flask(__name__)
+CORS(app)  # allow all origins for dev
+install_profiling(app)
+install_admission_stats(app)
+install_coalescing_stats(app)
+app.register_blueprint(like_predictor_bp)
+app.register_blueprint(generator_bp)
+
+
+def serve(ports, host='127.0.0.1'):
+    """Serve the app on every port, one threaded server per port."""
+    servers = [make_server(host, port, app, threaded=True) for port in ports]
+    threads = [threading.Thread(target=server.serve_forever, daemon=True) for server in servers]
+    for thread in threads:
+        thread.start()
+    return servers, threads
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Serve both APIs from one process.")
+    parser.add_argument('--ports', default='5000,5001', help="Comma-separated ports to listen on")
+    parser.add_argument('--host', default='127.0.0.1')
+    args = parser.parse_args()
+
+    ports = [int(port) for port in args.ports.split(',')]
+    servers, threads = serve(ports, args.host)
+    print(f"Gateway serving generator and like predictor routes on {args.host}:{', '.join(map(str, ports))}")
+    try:
+        for thread in threads:
+            thread.join()
+    except KeyboardInterrupt:
+        for server in servers:
+            server.shutdown()
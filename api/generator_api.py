@@ -1,47 +1,49 @@
-
-from flask import Flask, request, jsonify
-from generator import SimpleTweetGenerator
+from flask import Blueprint, Flask, request, jsonify
+from generator_simple import SimpleTweetGenerator
 from genenerator_ai import AITweetGenerator
 from advanced_generator import AdvancedTweetGenerator
-import joblib
-import numpy as np
-from textblob import TextBlob
 from datetime import datetime
+from features import FeatureBatch
+from dedup import NearDuplicateIndex, generate_distinct
+from scheduler import schedule_posts
+from admission import controller as admission, install_admission_stats
+from coalescing import coalescer, install_coalescing_stats
+from pregeneration import PregenerationPool
+from profiling import install_profiling
+from shared import load_like_model
+from thread_budget import configure_threads
+import logging
+import os
+import time
+
+bp = Blueprint('generator', __name__)
 
-app = Flask(__name__)
 generator = SimpleTweetGenerator()
 generator_ai = AITweetGenerator()
 advanced_generator = AdvancedTweetGenerator()
 
 # Load the like predictor model
 try:
-    like_predictor = joblib.load("like_predictor.pkl")
+    like_predictor = load_like_model()
 except:
     like_predictor = None
 
+# Split the host's cores between workers (CPU_CORE_BUDGET / WEB_CONCURRENCY).
+# Logging is only set up when run as a script, so an embedding app keeps its own.
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+thread_settings = configure_threads(model=like_predictor)
 
-def extract_features_from_tweet(tweet_text, has_media=False, hour=None):
-    """
-    Extract features from a generated tweet so we can feed them
-    into the Week 2 like prediction model.
-    """
-    if hour is None:
-        hour = datetime.now().hour
-
-    word_count = len(tweet_text.split())
-    char_count = len(tweet_text)
-    sentiment = TextBlob(tweet_text).sentiment.polarity
-
-    return {
-        'word_count': word_count,
-        'char_count': char_count,
-        'has_media': 1 if has_media else 0,
-        'hour': hour,
-        'sentiment': round(sentiment, 2)
-    }
+# Tweets issued per company, checked by requests with "dedupe": true
+dedup_index = NearDuplicateIndex(
+    capacity=int(os.environ.get('DEDUP_CAPACITY', 200000)),
+    threshold=float(os.environ.get('DEDUP_THRESHOLD', 0.8))
+)
+DEDUP_ATTEMPTS = 5
 
 
-@app.route('/generate', methods=['POST'])
+@bp.route('/generate', methods=['POST'])
+@admission.admit('generate')
 def generate():
     try:
         data = request.get_json()
@@ -50,14 +52,17 @@ def generate():
         message = data.get('message', 'Something awesome!')
         topic = data.get('topic', 'innovation')
         
-        generated_tweet = generator.generate_tweet(company, tweet_type, message, topic)
-        
-        return jsonify({
-            'generated_tweet': generated_tweet,
-            'success': True,
-            'company': company,
-            'type': tweet_type
-        })
+        response = {'success': True, 'company': company, 'type': tweet_type}
+        if data.get('dedupe'):
+            generated_tweet, response['dedup'] = generate_distinct(
+                lambda: generator.generate_tweet(company, tweet_type, message, topic),
+                dedup_index, company, DEDUP_ATTEMPTS
+            )
+        else:
+            generated_tweet = generator.generate_tweet(company, tweet_type, message, topic)
+
+        response['generated_tweet'] = generated_tweet
+        return jsonify(response)
         
     except Exception as e:
         return jsonify({
@@ -66,7 +71,8 @@ def generate():
         }), 500
 
 
-@app.route('/generate_and_predict', methods=['POST'])
+@bp.route('/generate_and_predict', methods=['POST'])
+@admission.admit('generate_and_predict')
 def generate_and_predict():
     """Generate a tweet AND predict how many likes it will get."""
     try:
@@ -94,60 +100,191 @@ def generate_and_predict():
         )
 
         # 2. Extract features from the generated tweet
-        features = extract_features_from_tweet(
-            generated_tweet,
-            has_media=has_media,
-            hour=hour
-        )
+        try:
+            batch = FeatureBatch.from_texts([generated_tweet], has_media=has_media, hour=hour)
+        except ValueError as e:
+            return jsonify({'error': f'Invalid features: {e}', 'success': False}), 400
+        features = batch.record(0)
 
-        # 3. Predict likes using the same feature ordering used elsewhere
-        #    in this file (has_media, char_count, word_count, hour, sentiment)
-        feature_vector = [[
-            features['has_media'],
-            features['char_count'],
-            features['word_count'],
-            features['hour'],
-            features['sentiment']
-        ]]
+        # 3. Predict likes (FeatureBatch keeps the training column order)
+        predictions, intervals = batch.predict_with_intervals(like_predictor)
 
-        predicted_likes = like_predictor.predict(feature_vector)[0]
-
-        return jsonify({
+        response = {
             'generated_tweet': generated_tweet,
-            'predicted_likes': int(predicted_likes),
+            'predicted_likes': int(predictions[0]),
             'predicted_features': features,
             'success': True
-        })
+        }
+        if intervals is not None:
+            response['predicted_likes_interval'] = intervals[0]
+        return jsonify(response)
     except Exception as e:
         return jsonify({
             'error': str(e),
             'success': False
         }), 500
 
-@app.route('/generate_ai', methods=['POST'])
+# Latency budget for /generate_ai when the request doesn't set deadline_ms
+AI_DEADLINE_MS = float(os.environ.get('AI_DEADLINE_MS', 3000))
+# Kept back from GPT-2 for the fallback generators and the response
+AI_FALLBACK_RESERVE_MS = 50
+# Below this much remaining budget GPT-2 isn't started at all
+AI_MIN_DECODE_MS = 150
+# Shortest GPT-2 output that is returned instead of falling back
+AI_MIN_WORDS = 4
+
+AI_METHODS = {
+    'ai': 'AI (GPT-2)',
+    'ai_partial': 'AI (GPT-2, stopped at deadline)',
+    'branded': 'Branded (fallback)',
+    'template': 'Template (fallback)',
+    'pregenerated': 'AI (GPT-2, pre-generated)',
+}
+
+
+def _ai_prompt(company, message, topic):
+    # This gives the AI context on what to write about
+    return f"A professional social media post from {company}: {message} about {topic}."
+
+
+def _usable_ai_tweet(tweet, stopped_at_deadline):
+    """A tweet cut off at the deadline must still end on a full sentence."""
+    if len(tweet.split()) < AI_MIN_WORDS:
+        return False
+    return not stopped_at_deadline or tweet[-1] in '.!?…'
+
+
+def _ai_params(data):
+    return {
+        'company': data.get('company', 'Our Company'),
+        'message': data.get('message', 'something new'),
+        'topic': data.get('topic', 'tech'),
+    }
+
+
+def _ai_budget_ms(data):
+    """The request's "deadline_ms", or None unless it is a positive number."""
+    try:
+        budget_ms = float(data.get('deadline_ms', AI_DEADLINE_MS))
+    except (TypeError, ValueError):
+        return None
+    return budget_ms if budget_ms > 0 else None
+
+
+def _ai_response(tweet, path, company, budget_ms, arrived, fallback_reason=None):
+    response = {
+        'generated_tweet': tweet,
+        'success': True,
+        'method': AI_METHODS[path],
+        'path': path,
+        'company': company,
+        'deadline_ms': budget_ms,
+        'elapsed_ms': round((time.monotonic() - arrived) * 1000, 1)
+    }
+    if fallback_reason:
+        response['fallback_reason'] = fallback_reason
+    return jsonify(response)
+
+
+def _pregenerated_ai():
+    """
+    Count a /generate_ai request and answer it from the pre-generation
+    pool if a candidate is ready. Runs before coalescing, so identical
+    concurrent requests each take their own candidate.
+    """
+    arrived = time.monotonic()
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return None
+    budget_ms = _ai_budget_ms(data)
+    if budget_ms is None:
+        return None
+
+    params = _ai_params(data)
+    pregeneration.record('generate_ai', params)
+    tweet = pregeneration.take('generate_ai', params)
+    if tweet is None:
+        return None
+    return _ai_response(tweet, 'pregenerated', params['company'], budget_ms, arrived)
+
+
+@bp.route('/generate_ai', methods=['POST'])
+@coalescer.coalesce('generate_ai', shortcut=_pregenerated_ai)
 def generate_ai():
+    """
+    GPT-2 generation within a latency budget.
+
+    The budget is "deadline_ms" from the body (default AI_DEADLINE_MS) and
+    counts from when the request arrived, including the wait for one of
+    the 'generate_ai' admission slots. The slot is held only while GPT-2
+    decodes. GPT-2 stops decoding when the budget is nearly spent and the
+    cleaned-up partial output is returned if it still ends on a full
+    sentence. Otherwise, or when the request is shed or no slot frees up
+    in time, the branded generator, then the template generator, write
+    the tweet. Popular requests may be answered from the pre-generation
+    pool instead. "path" says which one did.
+    """
     try:
-        data = request.get_json()
-        
+        data = request.get_json() or {}
+        arrived = time.monotonic()
+
         # 1. Extract inputs
-        company = data.get('company', 'Our Company')
-        topic = data.get('topic', 'tech')
-        message = data.get('message', 'something new')
-        
-        # 2. Create a prompt for GPT-2
-        # This gives the AI context on what to write about
-        prompt = f"A professional social media post from {company}: {message} about {topic}."
-        
-        # 3. Call the AI generator
-        ai_tweet = generator_ai.generate_ai_tweet(prompt)
-        
-        return jsonify({
-            'generated_tweet': ai_tweet,
-            'success': True,
-            'method': 'AI (GPT-2)',
-            'company': company
-        })
-        
+        params = _ai_params(data)
+        company, message, topic = params['company'], params['message'], params['topic']
+
+        budget_ms = _ai_budget_ms(data)
+        if budget_ms is None:
+            return jsonify({
+                'error': "'deadline_ms' must be a positive number.",
+                'success': False
+            }), 400
+        deadline = arrived + budget_ms / 1000.0
+
+        def remaining_ms():
+            return (deadline - time.monotonic()) * 1000 - AI_FALLBACK_RESERVE_MS
+
+        # 2. Popular requests were already offered the pre-generation pool
+        #    (_pregenerated_ai); wait for a GPT-2 slot, but only as long as
+        #    the budget allows
+        tweet, path, fallback_reason = None, None, None
+        if remaining_ms() < AI_MIN_DECODE_MS:
+            fallback_reason = 'budget spent before decoding'
+        else:
+            wait_s = (remaining_ms() - AI_MIN_DECODE_MS) / 1000.0
+            with admission.slot('generate_ai', timeout=wait_s) as refused:
+                decode_ms = remaining_ms()
+                if refused:
+                    fallback_reason = refused
+                elif decode_ms < AI_MIN_DECODE_MS:
+                    fallback_reason = 'budget spent before decoding'
+                else:
+                    try:
+                        ai_tweet, details = generator_ai.generate_ai_tweet(
+                            _ai_prompt(company, message, topic), max_time=decode_ms / 1000.0, return_details=True
+                        )
+                        if _usable_ai_tweet(ai_tweet, details['stopped_at_deadline']):
+                            tweet = ai_tweet
+                            path = 'ai_partial' if details['stopped_at_deadline'] else 'ai'
+                        else:
+                            fallback_reason = (
+                                'stopped at deadline' if details['stopped_at_deadline'] else 'unusable output'
+                            )
+                    except Exception as e:
+                        fallback_reason = f'AI generation failed: {e}'
+
+        # 3. Fall back to the cheap generators
+        if tweet is None:
+            try:
+                tweet = advanced_generator.generate_branded_tweet(
+                    company, data.get('industry', 'tech'), data.get('brand_voice', 'casual'), message, topic
+                )
+                path = 'branded'
+            except Exception:
+                tweet = generator.generate_tweet(company, 'general', message, topic)
+                path = 'template'
+
+        return _ai_response(tweet, path, company, budget_ms, arrived, fallback_reason)
+
     except Exception as e:
         return jsonify({
             'error': str(e),
@@ -155,7 +292,8 @@ def generate_ai():
         }), 500
 
 
-@app.route('/generate_branded', methods=['POST'])
+@bp.route('/generate_branded', methods=['POST'])
+@admission.admit('generate_branded')
 def generate_branded():
     try:
         data = request.get_json()
@@ -165,24 +303,28 @@ def generate_branded():
         message = data.get('message', 'something new')
         topic = data.get('topic', '')
         
-        branded_tweet = advanced_generator.generate_branded_tweet(
-            company, industry, brand_voice, message, topic
-        )
-        
-        return jsonify({
-            'generated_tweet': branded_tweet,
-            'success': True,
-            'method': 'Branded',
-            'brand_voice': brand_voice,
-            'industry': industry
-        })
+        response = {'success': True, 'method': 'Branded', 'brand_voice': brand_voice, 'industry': industry}
+        if data.get('dedupe'):
+            branded_tweet, response['dedup'] = generate_distinct(
+                lambda: advanced_generator.generate_branded_tweet(company, industry, brand_voice, message, topic),
+                dedup_index, company, DEDUP_ATTEMPTS
+            )
+        else:
+            branded_tweet = advanced_generator.generate_branded_tweet(
+                company, industry, brand_voice, message, topic
+            )
+
+        response['generated_tweet'] = branded_tweet
+        return jsonify(response)
     except Exception as e:
         return jsonify({
             'error': str(e),
             'success': False
         }), 500
 
-@app.route('/generate_smart', methods=['POST'])
+@bp.route('/generate_smart', methods=['POST'])
+@coalescer.coalesce('generate_smart')
+@admission.admit('generate_smart')
 def generate_smart():
     try:
         data = request.get_json()
@@ -191,24 +333,26 @@ def generate_smart():
         topic = data.get('topic', 'innovation')
         word_count = data.get('word_count_target', 15)
         sentiment = data.get('sentiment_target', 0.5)
-        has_media = data.get('has_media', False)
-        hour = data.get('optimal_hour', 14)
+        try:
+            has_media, hour = _media_and_hour(data, 'optimal_hour', 14)
+        except ValueError as e:
+            return jsonify({'error': str(e), 'success': False}), 400
         
         result = advanced_generator.generate_smart_tweet(
             company, message, topic, word_count, sentiment, has_media, hour
         )
         
+        try:
+            batch = FeatureBatch.from_records([result['predicted_features']])
+        except ValueError as e:
+            return jsonify({'error': f'Invalid features: {e}', 'success': False}), 400
+
         # Predict likes if model is available
         if like_predictor:
-            features = result['predicted_features']
-            prediction = like_predictor.predict([[
-                features['has_media'],
-                features['char_count'],
-                features['word_count'],
-                features['hour'],
-                features['sentiment']
-            ]])[0]
-            result['predicted_likes'] = int(prediction)
+            predictions, intervals = batch.predict_with_intervals(like_predictor)
+            result['predicted_likes'] = int(predictions[0])
+            if intervals is not None:
+                result['predicted_likes_interval'] = intervals[0]
         
         result['success'] = True
         result['method'] = 'Smart (ML-Optimized)'
@@ -220,28 +364,38 @@ def generate_smart():
             'success': False
         }), 500
 
-@app.route('/optimize_tweet', methods=['POST'])
+def _optimize_params(data):
+    return {
+        'company': data.get('company', 'Our Company'),
+        'message': data.get('message', 'something amazing'),
+        'topic': data.get('topic', 'innovation'),
+    }
+
+
+def _pregenerated_optimized():
+    """Count an /optimize_tweet request and answer it from the pre-generation pool if it can."""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return None
+
+    params = _optimize_params(data)
+    pregeneration.record('optimize_tweet', params)
+    result = pregeneration.take('optimize_tweet', params)
+    if result is None:
+        return None
+    result.update(pregenerated=True, success=True, method='Auto-Optimized for Maximum Likes')
+    return jsonify(result)
+
+
+@bp.route('/optimize_tweet', methods=['POST'])
+@coalescer.coalesce('optimize_tweet', shortcut=_pregenerated_optimized)
+@admission.admit('optimize_tweet')
 def optimize_tweet():
     try:
         data = request.get_json()
-        company = data.get('company', 'Our Company')
-        message = data.get('message', 'something amazing')
-        topic = data.get('topic', 'innovation')
-        
-        result = advanced_generator.optimize_for_likes(company, message, topic)
-        
-        # Predict likes for the optimized tweet
-        if like_predictor:
-            features = result['predicted_features']
-            prediction = like_predictor.predict([[
-                features['has_media'],
-                features['char_count'],
-                features['word_count'],
-                features['hour'],
-                features['sentiment']
-            ]])[0]
-            result['predicted_likes'] = int(prediction)
-        
+        params = _optimize_params(data)
+        result = _optimized_tweet(params['company'], params['message'], params['topic'])
+
         result['success'] = True
         result['method'] = 'Auto-Optimized for Maximum Likes'
         
@@ -252,14 +406,308 @@ def optimize_tweet():
             'success': False
         }), 500
 
-@app.route('/health', methods=['GET'])
+
+def _optimized_tweet(company, message, topic):
+    """Best of optimize_for_likes' variations, scored by the like predictor."""
+    result = advanced_generator.optimize_for_likes(company, message, topic)
+
+    # Predict likes for the optimized tweet
+    if like_predictor:
+        batch = FeatureBatch.from_records([result['predicted_features']])
+        predictions, intervals = batch.predict_with_intervals(like_predictor)
+        result['predicted_likes'] = int(predictions[0])
+        if intervals is not None:
+            result['predicted_likes_interval'] = intervals[0]
+    return result
+
+
+def _pregenerate_ai(params):
+    tweet = generator_ai.generate_ai_tweet(_ai_prompt(params['company'], params['message'], params['topic']))
+    return tweet if _usable_ai_tweet(tweet, False) else None
+
+
+# Candidates for the most requested /generate_ai and /optimize_tweet calls,
+# made while no request is in flight (enable with PREGENERATE=1)
+pregeneration = PregenerationPool(
+    producers={
+        'generate_ai': _pregenerate_ai,
+        'optimize_tweet': lambda params: _optimized_tweet(params['company'], params['message'], params['topic']),
+    },
+    is_idle=lambda: admission.in_flight() == 0,
+    ttl=float(os.environ.get('PREGENERATE_TTL', 600)),
+    per_key=int(os.environ.get('PREGENERATE_PER_KEY', 5)),
+    hot_keys=int(os.environ.get('PREGENERATE_HOT_KEYS', 20))
+)
+if os.environ.get('PREGENERATE') == '1':
+    pregeneration.start()
+
+# Largest number of specs accepted by /generate_batch in one request
+MAX_BATCH_SIZE = 10000
+
+
+def _media_and_hour(spec, hour_key, default_hour):
+    """
+    has_media and the posting hour of a request body or /generate_batch
+    spec, checked so a bad value is a 400 (or fails only its spec).
+    """
+    has_media = spec.get('has_media', False)
+    if has_media not in (True, False, 0, 1):
+        raise ValueError("'has_media' must be true or false.")
+
+    hour = spec.get(hour_key)
+    if hour is None:
+        return bool(has_media), default_hour
+    try:
+        hour = int(hour)
+    except (TypeError, ValueError):
+        hour = -1
+    if isinstance(spec.get(hour_key), bool) or not 0 <= hour <= 23:
+        raise ValueError(f"'{hour_key}' must be an integer from 0 to 23.")
+    return bool(has_media), hour
+
+
+def _text(spec, key, default):
+    """A text field of a /generate_batch spec, checked so one bad spec fails alone."""
+    value = spec.get(key, default)
+    if not isinstance(value, str):
+        raise ValueError(f"'{key}' must be a string.")
+    return value
+
+
+def _number(spec, key, default, low, high, integer=False):
+    """A numeric field of a /generate_batch spec within [low, high]."""
+    value = spec.get(key, default)
+    kind = int if integer else (int, float)
+    if isinstance(value, bool) or not isinstance(value, kind) or not low <= value <= high:
+        noun = 'an integer' if integer else 'a number'
+        raise ValueError(f"'{key}' must be {noun} from {low} to {high}.")
+    return value
+
+
+def _generate_from_spec(spec):
+    """
+    Run one /generate_batch spec through its generator.
+
+    Returns:
+        (tweet, predicted_features) where predicted_features is only set by
+        the smart generator, which already computed them
+    """
+    kind = spec.get('kind', 'template')
+    company = _text(spec, 'company', 'Our Company')
+
+    if kind == 'template':
+        tweet = generator.generate_tweet(
+            company,
+            _text(spec, 'tweet_type', 'general'),
+            _text(spec, 'message', 'Something awesome!'),
+            _text(spec, 'topic', 'innovation')
+        )
+        return tweet, None
+
+    if kind == 'branded':
+        tweet = advanced_generator.generate_branded_tweet(
+            company,
+            _text(spec, 'industry', 'tech'),
+            _text(spec, 'brand_voice', 'casual'),
+            _text(spec, 'message', 'something new'),
+            _text(spec, 'topic', '')
+        )
+        return tweet, None
+
+    if kind == 'smart':
+        has_media, hour = _media_and_hour(spec, 'optimal_hour', 14)
+        result = advanced_generator.generate_smart_tweet(
+            company,
+            _text(spec, 'message', 'something amazing'),
+            _text(spec, 'topic', 'innovation'),
+            _number(spec, 'word_count_target', 15, 1, 280, integer=True),
+            _number(spec, 'sentiment_target', 0.5, -1, 1),
+            has_media,
+            hour
+        )
+        return result['tweet'], result['predicted_features']
+
+    raise ValueError(f"Unknown generator kind '{kind}'. Use 'template', 'branded' or 'smart'.")
+
+
+@bp.route('/generate_batch', methods=['POST'])
+@admission.admit('generate_batch')
+def generate_batch():
+    """
+    Generate many tweets with mixed generators in one request.
+
+    Body: {"specs": [{"kind": "template" | "branded" | "smart", ...params}, ...]}
+    where params are the same fields the single endpoints take, plus
+    has_media/hour for template and branded specs. Features for all tweets
+    are extracted in bulk and likes are predicted with one model call.
+    Results come back in spec order; a failing spec gets its own error.
+    With "dedupe": true each tweet is regenerated while it is a
+    near-duplicate of one already issued for the same company.
+    """
+    try:
+        data = request.get_json() or {}
+        specs = data.get('specs')
+        if not isinstance(specs, list):
+            return jsonify({
+                'error': "'specs' must be a list of generator specs.",
+                'success': False
+            }), 400
+        if len(specs) > MAX_BATCH_SIZE:
+            return jsonify({
+                'error': f'At most {MAX_BATCH_SIZE} specs per request.',
+                'success': False
+            }), 400
+
+        dedupe = bool(data.get('dedupe'))
+        current_hour = datetime.now().hour
+        results = [None] * len(specs)
+
+        # Template/branded tweets need feature extraction, smart tweets come with features
+        texts, text_media, text_hours, text_rows = [], [], [], []
+        smart_features, smart_rows = [], []
+
+        for i, spec in enumerate(specs):
+            try:
+                if not isinstance(spec, dict):
+                    raise ValueError('Each spec must be an object.')
+                has_media, hour = _media_and_hour(spec, 'hour', current_hour)
+                dedup = None
+                if dedupe:
+                    (tweet, features), dedup = generate_distinct(
+                        lambda: _generate_from_spec(spec), dedup_index,
+                        spec.get('company', 'Our Company'), DEDUP_ATTEMPTS,
+                        text_of=lambda generated: generated[0]
+                    )
+                else:
+                    tweet, features = _generate_from_spec(spec)
+            except Exception as e:
+                results[i] = {'index': i, 'error': str(e), 'success': False}
+                continue
+
+            results[i] = {
+                'index': i,
+                'kind': spec.get('kind', 'template'),
+                'generated_tweet': tweet,
+                'success': True
+            }
+            if dedup is not None:
+                results[i]['dedup'] = dedup
+            if features is not None:
+                smart_features.append(features)
+                smart_rows.append(i)
+            else:
+                texts.append(tweet)
+                text_media.append(has_media)
+                text_hours.append(hour)
+                text_rows.append(i)
+
+        batches = []
+        if texts:
+            batches.append(FeatureBatch.from_texts(texts, has_media=text_media, hour=text_hours))
+        if smart_features:
+            batches.append(FeatureBatch.from_records(smart_features))
+
+        if batches:
+            batch = FeatureBatch.concat(batches)
+            predictions, intervals = None, None
+            if like_predictor is not None:
+                predictions, intervals = batch.predict_with_intervals(like_predictor)
+            for row, i in enumerate(text_rows + smart_rows):
+                results[i]['predicted_features'] = batch.record(row)
+                if predictions is not None:
+                    results[i]['predicted_likes'] = int(predictions[row])
+                if intervals is not None:
+                    results[i]['predicted_likes_interval'] = intervals[row]
+
+        return jsonify({
+            'results': results,
+            'count': len(results),
+            'errors': sum(1 for r in results if not r['success']),
+            'near_duplicates': sum(1 for r in results if r.get('dedup', {}).get('near_duplicate')),
+            'model_loaded': like_predictor is not None,
+            'success': True
+        })
+    except Exception as e:
+        return jsonify({
+            'error': str(e),
+            'success': False
+        }), 500
+
+@bp.route('/schedule', methods=['POST'])
+@admission.admit('schedule')
+def schedule():
+    """
+    Pick posting times for many drafts to maximize total predicted likes.
+
+    Body: {"drafts": [{"text": ..., "company": ..., "media_available": bool}, ...],
+           "days": 7, "window": [9, 21], "min_spacing_hours": 3,
+           "max_posts_per_hour": 1, "start_date": "YYYY-MM-DD", "method": "auto"}
+    Drafts may also be plain strings. Spacing and per-hour limits apply per company.
+    """
+    try:
+        if like_predictor is None:
+            return jsonify({
+                'error': 'Like prediction model is not loaded.',
+                'success': False
+            }), 500
+
+        data = request.get_json() or {}
+        drafts = data.get('drafts')
+        if not isinstance(drafts, list) or len(drafts) > MAX_BATCH_SIZE:
+            return jsonify({
+                'error': f"'drafts' must be a list of at most {MAX_BATCH_SIZE} drafts.",
+                'success': False
+            }), 400
+        drafts = [{'text': d} if isinstance(d, str) else d for d in drafts]
+        if not all(isinstance(d, dict) and isinstance(d.get('text'), str) and d['text'] for d in drafts):
+            return jsonify({
+                'error': "Each draft needs a non-empty 'text'.",
+                'success': False
+            }), 400
+
+        start_date = data.get('start_date')
+        try:
+            result = schedule_posts(
+                drafts,
+                like_predictor,
+                days=int(data.get('days', 7)),
+                window=data.get('window'),
+                min_spacing_hours=int(data.get('min_spacing_hours', 0)),
+                max_posts_per_hour=int(data.get('max_posts_per_hour', 1)),
+                start_date=datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else None,
+                method=data.get('method', 'auto')
+            )
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': str(e), 'success': False}), 400
+
+        result['success'] = True
+        return jsonify(result)
+    except Exception as e:
+        return jsonify({
+            'error': str(e),
+            'success': False
+        }), 500
+
+@bp.route('/health', methods=['GET'])
+@admission.admit('health')
 def health():
     return jsonify({
         'status': 'Tweet Generator API is running!',
-        'model_loaded': like_predictor is not None
+        'model_loaded': like_predictor is not None,
+        'in_flight': admission.in_flight(),
+        'threads': thread_settings,
+        'dedup': dedup_index.stats(),
+        'ai_assist': generator_ai.assist_stats(),
+        'pregeneration': pregeneration.stats()
     })
 
 
+app = Flask(__name__)
+install_profiling(app)
+install_admission_stats(app)
+install_coalescing_stats(app)
+app.register_blueprint(bp)
+
 
 if __name__ == '__main__':
     app.run(debug=True, port=5001)  # Different port from your Week 2 API
@@ -1,27 +1,117 @@
-from flask import Flask, request, jsonify
+from flask import Blueprint, Flask, request, jsonify
 from flask_cors import CORS
-import joblib
-import numpy as np
+import os
+from features import FeatureBatch
+from intervals import validate_quantiles
+from admission import controller as admission, install_admission_stats
+from coalescing import coalescer, install_coalescing_stats
+from profiling import install_profiling
+from engagement_index import EngagementIndex
+from shared import load_like_model
+from thread_budget import configure_threads
+import logging
 
-app = Flask(__name__)
-CORS(app)  # allow all origins for dev
+bp = Blueprint('like_predictor', __name__)
+
+model = load_like_model()
 
-model = joblib.load("like_predictor.pkl")
+# Split the host's cores between workers (CPU_CORE_BUDGET / WEB_CONCURRENCY).
+# Logging is only set up when run as a script, so an embedding app keeps its own.
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+configure_threads(model=model)
 
-@app.route('/predict', methods=['POST'])
+# Historical like statistics, built by model&data/build_engagement_index.py
+try:
+    engagement_index = EngagementIndex(os.environ.get('ENGAGEMENT_INDEX', 'engagement_index'))
+except Exception:
+    engagement_index = None
+
+@bp.route('/predict', methods=['POST'])
+@coalescer.coalesce('predict')
+@admission.admit('predict')
 def predict():
     data = request.get_json()
 
-    features = np.array([
-        data['word_count'],
-        data['char_count'],
-        data['has_media'],
-        data['hour'],
-        data['sentiment']
-    ]).reshape(1, -1)
+    try:
+        quantiles = validate_quantiles(data.get('quantiles'))
+    except ValueError as e:
+        return jsonify({'error': str(e), 'success': False}), 400
+
+    try:
+        features = FeatureBatch.from_records([data])
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({'error': f'Invalid features: {e}', 'success': False}), 400
+
+    predictions, intervals = features.predict_with_intervals(model, quantiles)
+    response = {'predicted_likes': int(predictions[0])}
+    if intervals is not None:
+        response['predicted_likes_interval'] = intervals[0]
+    return jsonify(response)
+
+
+@bp.route('/predict_batch', methods=['POST'])
+@admission.admit('predict_batch')
+def predict_batch():
+    """
+    Predict likes for {"instances": [{word_count, char_count, ...}, ...]} in one
+    model call, with per-tree quantiles for each instance when the model has them.
+    """
+    data = request.get_json() or {}
+    instances = data.get('instances')
+    if not isinstance(instances, list):
+        return jsonify({'error': "'instances' must be a list of feature objects.", 'success': False}), 400
+
+    try:
+        quantiles = validate_quantiles(data.get('quantiles'))
+    except ValueError as e:
+        return jsonify({'error': str(e), 'success': False}), 400
 
-    prediction = model.predict(features)[0]
-    return jsonify({'predicted_likes': int(prediction)})
+    try:
+        features = FeatureBatch.from_records(instances)
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({'error': f'Invalid features: {e}', 'success': False}), 400
+
+    predictions, intervals = features.predict_with_intervals(model, quantiles)
+    response = {'predicted_likes': [int(p) for p in predictions]}
+    if intervals is not None:
+        response['predicted_likes_intervals'] = intervals
+    return jsonify(response)
+
+
+@bp.route('/engagement_prior', methods=['GET'])
+@admission.admit('engagement_prior')
+def engagement_prior():
+    """
+    Historical median/p90 likes for a company, hour, day of week, media
+    presence and the known terms in a text, e.g.
+    /engagement_prior?company=Nike&hour=14&day=friday&has_media=1&text=new+drop
+    """
+    if engagement_index is None:
+        return jsonify({
+            'error': 'Engagement index is not loaded.',
+            'success': False
+        }), 503
+
+    args = request.args
+    hour = args.get('hour', type=int)
+    prior = engagement_index.prior(
+        company=args.get('company'),
+        hour=hour,
+        day_of_week=args.get('day'),
+        has_media=args.get('has_media'),
+        text=args.get('text')
+    )
+    prior['success'] = True
+    return jsonify(prior)
+
+
+app = Flask(__name__)
+CORS(app)  # allow all origins for dev
+install_profiling(app)
+install_admission_stats(app)
+install_coalescing_stats(app)
+app.register_blueprint(bp)
 
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,192 @@
+"""
+Background pre-generation for popular requests.
+
+The most requested /generate_ai and /optimize_tweet calls are for a
+predictable set of company/topic pairs. PregenerationPool counts requests
+per pair (with exponential decay, so yesterday's launch cools off) and,
+while the API is idle, a background thread fills a small pool of ready
+candidates for the hottest pairs. A request that finds a fresh candidate
+is answered from the pool in milliseconds; each candidate is served once
+and expires after a TTL.
+
+Memory is bounded by max_keys pools of at most per_key candidates. The
+worker only produces while no request is in flight, and checks again
+between candidates, so it mostly uses CPU the API would leave idle.
+"""
+import logging
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class PregenerationPool:
+    """
+    Request frequency tracking plus a TTL-bounded pool of pre-made results.
+
+    Args:
+        producers: kind -> function(params) returning a result to pool, or
+            None if the attempt produced nothing usable. Keys ignore case
+            and surrounding spaces, but params are the latest request's
+            own, so candidates keep the caller's casing.
+        is_idle: no-argument callable, True when background work may run
+        ttl: seconds a candidate stays servable
+        per_key: candidates kept per (kind, params) key
+        hot_keys: how many of the most requested keys are kept filled
+        min_requests: decayed request count before a key counts as hot
+        max_keys: keys with a pool at once; the coldest pool is dropped
+        max_tracked: keys whose request counts are kept; the coldest half
+            is forgotten when it overflows
+        half_life: seconds after which a request counts half as much
+        poll_interval: seconds the worker sleeps when there is nothing to do
+    """
+
+    def __init__(self, producers, is_idle, ttl=600, per_key=5, hot_keys=20, min_requests=2,
+                 max_keys=100, max_tracked=10000, half_life=900, poll_interval=0.5):
+        self.producers = producers
+        self.is_idle = is_idle
+        self.ttl = ttl
+        self.per_key = per_key
+        self.hot_keys = hot_keys
+        self.min_requests = min_requests
+        self.max_keys = max_keys
+        self.max_tracked = max_tracked
+        self.half_life = half_life
+        self.poll_interval = poll_interval
+
+        self._lock = threading.Lock()
+        self._counts = {}
+        self._params = {}
+        self._pools = {}
+        self._decayed_at = time.monotonic()
+        self._stop = threading.Event()
+        self._thread = None
+        self.counters = {'hits': 0, 'misses': 0, 'produced': 0, 'expired': 0, 'failed': 0}
+
+    @staticmethod
+    def key(kind, params):
+        """Requests that differ only in case or surrounding spaces share a key."""
+        return (kind,) + tuple(
+            (name, str(value).strip().lower()) for name, value in sorted(params.items())
+        )
+
+    def _decay(self, now):
+        elapsed = now - self._decayed_at
+        if elapsed < self.half_life / 10:
+            return
+        factor = 0.5 ** (elapsed / self.half_life)
+        self._decayed_at = now
+        for key in list(self._counts):
+            self._counts[key] *= factor
+            if self._counts[key] < 0.05:
+                del self._counts[key]
+                self._params.pop(key, None)
+
+    def record(self, kind, params):
+        """Count one request; call for every request the pool could serve."""
+        key = self.key(kind, params)
+        with self._lock:
+            self._decay(time.monotonic())
+            self._counts[key] = self._counts.get(key, 0.0) + 1.0
+            # Match on the normalised key, generate from the caller's text
+            self._params[key] = dict(params)
+            if len(self._counts) > self.max_tracked:
+                coldest = sorted(self._counts, key=self._counts.get)[:len(self._counts) - self.max_tracked // 2]
+                for cold in coldest:
+                    del self._counts[cold]
+                    self._params.pop(cold, None)
+        return key
+
+    def take(self, kind, params):
+        """Pop a fresh pre-generated result for the request, or None."""
+        key = self.key(kind, params)
+        now = time.monotonic()
+        with self._lock:
+            pool = self._pools.get(key)
+            while pool and now - pool[0][0] > self.ttl:
+                pool.popleft()
+                self.counters['expired'] += 1
+            if pool:
+                self.counters['hits'] += 1
+                return pool.popleft()[1]
+            self.counters['misses'] += 1
+            return None
+
+    def _next_key(self):
+        """Hottest key whose pool is below per_key, dropping expired and cold pools."""
+        now = time.monotonic()
+        with self._lock:
+            self._decay(now)
+            hot = sorted(
+                (key for key, count in self._counts.items() if count >= self.min_requests),
+                key=self._counts.get, reverse=True
+            )[:self.hot_keys]
+
+            for pool in self._pools.values():
+                while pool and now - pool[0][0] > self.ttl:
+                    pool.popleft()
+                    self.counters['expired'] += 1
+            # Keep memory bounded: drop the coldest pools first
+            for key in sorted(self._pools, key=lambda k: self._counts.get(k, 0.0)):
+                if len(self._pools) <= self.max_keys and (self._pools[key] or key in hot):
+                    continue
+                del self._pools[key]
+
+            for key in hot:
+                if len(self._pools.get(key, ())) < self.per_key:
+                    return key, self._params[key]
+        return None, None
+
+    def fill_once(self):
+        """Produce one candidate for the hottest under-filled key. Returns True if it did."""
+        key, params = self._next_key()
+        if key is None:
+            return False
+
+        try:
+            result = self.producers[key[0]](params)
+        except Exception:
+            logger.exception("Pre-generation failed for %s", key)
+            result = None
+        if result is None:
+            with self._lock:
+                self.counters['failed'] += 1
+            return False
+
+        with self._lock:
+            self._pools.setdefault(key, deque()).append((time.monotonic(), result))
+            self.counters['produced'] += 1
+        return True
+
+    def _run(self):
+        while not self._stop.is_set():
+            if not self.is_idle() or not self.fill_once():
+                self._stop.wait(self.poll_interval)
+
+    def start(self):
+        """Start the background worker (once)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='pregeneration', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def stats(self):
+        with self._lock:
+            top = sorted(self._counts.items(), key=lambda item: item[1], reverse=True)[:5]
+            return {
+                'running': self._thread is not None,
+                'keys_tracked': len(self._counts),
+                'pools': len(self._pools),
+                'candidates': sum(len(pool) for pool in self._pools.values()),
+                'top_requests': [
+                    {'kind': key[0], **dict(key[1:]), 'requests': round(count, 1)} for key, count in top
+                ],
+                **self.counters,
+            }
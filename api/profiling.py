@@ -0,0 +1,269 @@
+"""
+On-demand profiling for the Flask APIs.
+
+Two modes, both restricted to admins (requests must carry an X-Admin-Token
+header matching the PROFILE_ADMIN_TOKEN environment variable; profiling is
+disabled when that variable is not set):
+
+1. Per-request profiling. Send `X-Profile: 1` (or `?profile=1`) with a
+   request and it runs under cProfile. The response JSON gets a `profile`
+   key with the time spent in template rendering, TextBlob, forest
+   prediction and GPT-2, and the breakdown is kept for later at
+   GET /admin/profiles.
+
+2. Sampling. POST /admin/sampler/start?seconds=30&interval_ms=10 samples
+   the stacks of every thread in the background for the window, and
+   GET /admin/sampler/dump returns the aggregated hot stacks in collapsed
+   ("flamegraph") format. Overhead is one stack walk per interval.
+
+Only one request is profiled at a time; a second profiled request that
+arrives meanwhile runs normally and says so in its `profile` key.
+"""
+import cProfile
+import hmac
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict, deque
+
+from flask import current_app, g, jsonify, request
+
+# Stage name -> path fragments of the modules whose time counts towards it
+STAGES = {
+    'gpt2': ('transformers', 'torch', 'tokenizers', 'genenerator_ai'),
+    'forest': ('sklearn', 'joblib'),
+    'textblob': ('textblob', 'nltk'),
+    'template': ('generator_simple', 'advanced_generator'),
+}
+
+# Stages that can be reached from inside template code (the smart generator
+# scores its own tweets with TextBlob), subtracted so nothing is counted twice
+LEAF_STAGES = ('gpt2', 'forest', 'textblob')
+
+MAX_STORED_PROFILES = 50
+
+_profile_lock = threading.Lock()
+_profiles = deque(maxlen=MAX_STORED_PROFILES)
+
+
+def _stage_of(filename):
+    path = filename.replace('\\', '/')
+    for stage, fragments in STAGES.items():
+        for fragment in fragments:
+            if f'/{fragment}/' in path or path.endswith(f'/{fragment}.py'):
+                return stage
+    return None
+
+
+def is_admin():
+    """True if the request carries the admin token."""
+    expected = os.environ.get('PROFILE_ADMIN_TOKEN', '')
+    provided = request.headers.get('X-Admin-Token', '')
+    return bool(expected) and hmac.compare_digest(expected, provided)
+
+
+def _profiling_requested():
+    flag = request.headers.get('X-Profile') or request.args.get('profile')
+    return flag in ('1', 'true', 'yes') and is_admin()
+
+
+def stage_breakdown(profiler, total_seconds):
+    """
+    Attribute the profiled time to stages.
+
+    A stage's time is the cumulative time of every call that enters it from
+    code outside the stage, so time spent in numpy under sklearn still counts
+    as forest time.
+
+    Returns:
+        dict with milliseconds per stage, 'other' and 'total', plus the
+        slowest functions by own time
+    """
+    stats = pstats.Stats(profiler).stats
+    inclusive = defaultdict(float)
+    nested_in_template = 0.0
+
+    for func, (_, _, _, _, callers) in stats.items():
+        stage = _stage_of(func[0])
+        if stage is None:
+            continue
+        for caller, caller_stats in callers.items():
+            caller_stage = _stage_of(caller[0])
+            if caller_stage == stage:
+                continue
+            # caller_stats is (nc, cc, tt, ct) for calls from this caller
+            inclusive[stage] += caller_stats[3]
+            if caller_stage == 'template' and stage in LEAF_STAGES:
+                nested_in_template += caller_stats[3]
+
+    exclusive = {stage: min(inclusive[stage], total_seconds) for stage in STAGES}
+    exclusive['template'] = max(0.0, exclusive['template'] - nested_in_template)
+    other = max(0.0, total_seconds - sum(exclusive.values()))
+
+    hot = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)[:10]
+
+    return {
+        'stages_ms': {stage: round(seconds * 1000, 3) for stage, seconds in exclusive.items()},
+        'other_ms': round(other * 1000, 3),
+        'total_ms': round(total_seconds * 1000, 3),
+        'hot_functions': [
+            {
+                'function': f"{os.path.basename(func[0])}:{func[1]}({func[2]})",
+                'calls': calls,
+                'own_ms': round(own * 1000, 3),
+                'cumulative_ms': round(cumulative * 1000, 3),
+            }
+            for func, (_, calls, own, cumulative, _) in hot
+        ],
+    }
+
+
+class StackSampler:
+    """Periodically samples every thread's stack and counts identical stacks."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = Counter()
+        self._thread = None
+        self._stop = threading.Event()
+        self.samples = 0
+        self.started_at = None
+        self.interval = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, seconds=30.0, interval=0.01):
+        """Start a sampling window. Returns False if one is already running."""
+        with self._lock:
+            if self.running:
+                return False
+            self._counts = Counter()
+            self.samples = 0
+            self.started_at = time.time()
+            self.interval = interval
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, args=(seconds, interval), daemon=True, name='stack-sampler'
+            )
+            self._thread.start()
+            return True
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self, seconds, interval):
+        own_id = threading.get_ident()
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline and not self._stop.wait(interval):
+            stacks = []
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                stacks.append(';'.join(reversed(stack)))
+            with self._lock:
+                self._counts.update(stacks)
+                self.samples += 1
+
+    def dump(self, limit=200):
+        """Hot stacks in collapsed format, most frequent first."""
+        with self._lock:
+            return {
+                'running': self.running,
+                'samples': self.samples,
+                'interval_ms': None if self.interval is None else self.interval * 1000,
+                'started_at': self.started_at,
+                'stacks': [f"{stack} {count}" for stack, count in self._counts.most_common(limit)],
+            }
+
+
+sampler = StackSampler()
+
+
+def install_profiling(app):
+    """Register the profiling hooks and admin routes on a Flask app."""
+
+    @app.before_request
+    def _start_request_profile():
+        if not _profiling_requested():
+            return
+        g.profile_started = time.perf_counter()
+        if not _profile_lock.acquire(blocking=False):
+            return
+        g.profiler = cProfile.Profile()
+        try:
+            g.profiler.enable()
+        except ValueError:
+            # Another profiler, such as a debugger, is already active
+            g.profiler = None
+            _profile_lock.release()
+
+    @app.after_request
+    def _finish_request_profile(response):
+        if 'profile_started' not in g:
+            return response
+
+        if g.get('profiler') is not None:
+            g.profiler.disable()
+            total = time.perf_counter() - g.profile_started
+            profile = stage_breakdown(g.profiler, total)
+            g.profiler = None
+            _profile_lock.release()
+
+            profile['id'] = uuid.uuid4().hex[:12]
+            profile['endpoint'] = request.endpoint
+            profile['timestamp'] = time.time()
+            _profiles.append(profile)
+            response.headers['X-Profile-Id'] = profile['id']
+        else:
+            profile = {'skipped': 'Another request is being profiled, try again.'}
+
+        data = response.get_json(silent=True)
+        if isinstance(data, dict):
+            data['profile'] = profile
+            response.set_data(current_app.json.dumps(data))
+        return response
+
+    @app.teardown_request
+    def _release_request_profile(exc):
+        # after_request is skipped when a view raises, don't leak the lock
+        if g.get('profiler') is not None:
+            g.profiler.disable()
+            g.profiler = None
+            _profile_lock.release()
+
+    @app.route('/admin/profiles', methods=['GET'])
+    def admin_profiles():
+        if not is_admin():
+            return jsonify({'error': 'Admin token required.', 'success': False}), 403
+        return jsonify({'profiles': list(_profiles), 'success': True})
+
+    @app.route('/admin/sampler/start', methods=['POST'])
+    def admin_sampler_start():
+        if not is_admin():
+            return jsonify({'error': 'Admin token required.', 'success': False}), 403
+        seconds = request.args.get('seconds', 30, type=float)
+        interval_ms = request.args.get('interval_ms', 10, type=float)
+        if not sampler.start(seconds=seconds, interval=max(interval_ms, 1) / 1000.0):
+            return jsonify({'error': 'Sampler is already running.', 'success': False}), 409
+        return jsonify({'success': True, 'seconds': seconds, 'interval_ms': interval_ms})
+
+    @app.route('/admin/sampler/dump', methods=['GET'])
+    def admin_sampler_dump():
+        if not is_admin():
+            return jsonify({'error': 'Admin token required.', 'success': False}), 403
+        limit = request.args.get('limit', 200, type=int)
+        if request.args.get('format') == 'collapsed':
+            return '\n'.join(sampler.dump(limit)['stacks']) + '\n', 200, {'Content-Type': 'text/plain'}
+        return jsonify(sampler.dump(limit))
+
+    return app
@@ -0,0 +1,19 @@
+"""
+Process-wide resources shared by every API module loaded into a process.
+
+When the generator and like predictor routes run in one process (see
+gateway.py) they get the same model instance instead of loading
+like_predictor.pkl twice.
+"""
+import functools
+import os
+
+import joblib
+
+MODEL_PATH = os.environ.get('LIKE_MODEL_PATH', 'like_predictor.pkl')
+
+
+@functools.lru_cache(maxsize=None)
+def load_like_model(path=MODEL_PATH):
+    """Load the like predictor once per process and path."""
+    return joblib.load(path)
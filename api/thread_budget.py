@@ -0,0 +1,127 @@
+"""
+CPU thread budget for torch, BLAS/OpenMP and the like predictor.
+
+By default every worker process sizes its thread pools to the whole
+machine: torch runs GPT-2 with one intra-op thread per core, BLAS/OpenMP
+do the same, and several Flask workers on one host end up with
+workers x cores threads fighting over the cores. This module splits a
+per-host core budget between the workers instead:
+
+    CPU_CORE_BUDGET   cores this service may use on the host (default: all)
+    WEB_CONCURRENCY   worker processes sharing that budget (default: 1)
+    FOREST_N_JOBS     n_jobs for the forest (default: 1, capped at the
+                      per-worker budget; threads only help large batches,
+                      single-row predictions get slower)
+
+Call configure_threads() after loading the model. The plan is applied once
+per process; later calls (e.g. from the second API module in gateway.py)
+only set the forest's n_jobs and return the settings already in effect.
+BLAS and OpenMP pools that are already loaded are resized through
+threadpoolctl, and the environment variables are set for anything started
+later. Thread variables the operator set (OMP_NUM_THREADS, ...) win: they
+are left as they are, and neither the native pools nor torch are resized.
+"""
+import importlib.util
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+THREAD_ENV_VARS = (
+    'OMP_NUM_THREADS',
+    'MKL_NUM_THREADS',
+    'OPENBLAS_NUM_THREADS',
+    'VECLIB_MAXIMUM_THREADS',
+    'NUMEXPR_NUM_THREADS',
+)
+
+_lock = threading.Lock()
+_effective = None
+
+
+def plan_threads(cores=None, workers=None, forest_n_jobs=None):
+    """
+    Work out per-worker thread counts from the host budget.
+
+    Args:
+        cores: cores available to the service (CPU_CORE_BUDGET, else all)
+        workers: worker processes on the host (WEB_CONCURRENCY, else 1)
+        forest_n_jobs: forest parallelism (FOREST_N_JOBS, else 1)
+
+    Returns:
+        dict with the thread counts each worker should use
+    """
+    cores = cores or int(os.environ.get('CPU_CORE_BUDGET', 0)) or os.cpu_count() or 1
+    workers = workers or int(os.environ.get('WEB_CONCURRENCY', 0)) or 1
+    per_worker = max(1, cores // workers)
+
+    if forest_n_jobs is None:
+        forest_n_jobs = int(os.environ.get('FOREST_N_JOBS', 1))
+
+    return {
+        'cores': cores,
+        'workers': workers,
+        'intra_op_threads': per_worker,
+        # Flask already serves requests on separate threads
+        'inter_op_threads': 1,
+        'blas_threads': per_worker,
+        'forest_n_jobs': max(1, min(forest_n_jobs, per_worker)),
+    }
+
+
+def configure_threads(cores=None, workers=None, forest_n_jobs=None, model=None):
+    """
+    Apply the thread plan to this process (once) and log the effective settings.
+
+    Args:
+        cores, workers, forest_n_jobs: see plan_threads
+        model: like predictor whose n_jobs should be set, if any
+
+    Returns:
+        dict of the settings actually in effect
+    """
+    global _effective
+    with _lock:
+        if _effective is None:
+            _effective = _apply(plan_threads(cores, workers, forest_n_jobs))
+            logger.info("CPU thread budget: %s", _effective)
+
+        if model is not None and hasattr(model, 'n_jobs'):
+            model.n_jobs = _effective['forest_n_jobs']
+        return dict(_effective)
+
+
+def _apply(plan):
+    operator_set = {var: os.environ[var] for var in THREAD_ENV_VARS if var in os.environ}
+    for var in THREAD_ENV_VARS:
+        os.environ.setdefault(var, str(plan['blas_threads']))
+
+    effective = dict(plan, operator_thread_vars=operator_set or None)
+
+    # threadpoolctl ships with scikit-learn and resizes already-loaded pools
+    try:
+        from threadpoolctl import threadpool_info, threadpool_limits
+        if not operator_set:
+            threadpool_limits(limits=plan['blas_threads'])
+        effective['native_pools'] = {
+            f"{pool['internal_api']}:{os.path.basename(pool['filepath'])}": pool['num_threads']
+            for pool in threadpool_info()
+        }
+    except ImportError:
+        effective['native_pools'] = None
+
+    if importlib.util.find_spec('torch') is not None:
+        import torch
+        # torch sizes its intra-op pool from OMP_NUM_THREADS when it is set
+        if 'OMP_NUM_THREADS' not in operator_set:
+            torch.set_num_threads(plan['intra_op_threads'])
+        try:
+            torch.set_num_interop_threads(plan['inter_op_threads'])
+        except RuntimeError:
+            # Can only be set once, before torch runs any parallel work
+            pass
+        effective['torch_intra_op_threads'] = torch.get_num_threads()
+        effective['torch_inter_op_threads'] = torch.get_num_interop_threads()
+
+    return effective
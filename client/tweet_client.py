@@ -0,0 +1,407 @@
+"""
+Python client for the tweet generator and like predictor APIs.
+
+- One pooled keep-alive session per client instead of a new connection per
+  request
+- Bounded concurrency: at most `max_concurrency` requests in flight
+- Retries with jittered exponential backoff on connection errors and
+  429/502/503/504 responses, honouring Retry-After
+- Optional auto-batching: concurrent single generate/predict calls are
+  grouped into /generate_batch and /predict_batch requests
+- A sync client (TweetClient) and an asyncio client (AsyncTweetClient)
+
+Usage:
+    from tweet_client import TweetClient
+
+    with TweetClient(auto_batch=True) as client:
+        client.generate('Nike', tweet_type='announcement', message='new shoe')
+        client.predict(word_count=15, char_count=120, has_media=1, hour=14, sentiment=0.8)
+
+    async with AsyncTweetClient() as client:
+        results = await asyncio.gather(*(client.generate('Nike') for _ in range(100)))
+
+With auto_batch=True, generate / generate_branded / generate_smart return
+the /generate_batch item for the call (generated_tweet, predicted_features,
+predicted_likes; generate_smart has the tweet under 'tweet', like
+/generate_smart) and predict returns {'predicted_likes': n}.
+"""
+import asyncio
+import queue
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRY_STATUSES = {429, 502, 503, 504}
+
+FEATURE_NAMES = ('word_count', 'char_count', 'has_media', 'hour', 'sentiment')
+
+_STOP = object()
+
+
+class TweetClientError(Exception):
+    """Raised when a request fails after all retries or the API reports an error."""
+
+    def __init__(self, message, status=None, payload=None):
+        super().__init__(message)
+        self.status = status
+        self.payload = payload
+
+
+class _Batcher:
+    """
+    Collects single calls for up to `window` seconds (or `max_size` calls)
+    and sends them as one batch request from a background thread.
+    """
+
+    def __init__(self, send_batch, window, max_size, max_in_flight):
+        self._send_batch = send_batch
+        self._window = window
+        self._max_size = max_size
+        self._queue = queue.Queue()
+        self._senders = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix='tweet-client-batch')
+        self._thread = threading.Thread(target=self._run, daemon=True, name='tweet-client-batcher')
+        self._thread.start()
+
+    def submit(self, payload):
+        future = Future()
+        self._queue.put((payload, future))
+        return future
+
+    def close(self):
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._senders.shutdown(wait=True)
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+            items = [first]
+            deadline = time.monotonic() + self._window
+            while len(items) < self._max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                items.append(item)
+            self._senders.submit(self._flush, items)
+
+    def _flush(self, items):
+        try:
+            results = self._send_batch([payload for payload, _ in items])
+        except Exception as e:
+            for _, future in items:
+                future.set_exception(e)
+            return
+
+        for (_, future), result in zip(items, results):
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            elif isinstance(result, dict) and result.get('success') is False:
+                future.set_exception(TweetClientError(result.get('error', 'Request failed'), payload=result))
+            else:
+                future.set_result(result)
+
+
+class TweetClient:
+    def __init__(self, generator_url='http://localhost:5001', predictor_url='http://localhost:5000',
+                 max_concurrency=16, retries=3, backoff=0.2, max_backoff=5.0, timeout=30.0,
+                 auto_batch=False, batch_window=0.005, max_batch_size=256):
+        """
+        Args:
+            generator_url: base URL of the generator API
+            predictor_url: base URL of the like predictor API
+            max_concurrency: most requests in flight at once (also the pool size)
+            retries: retries after the first attempt
+            backoff: base delay in seconds, doubled every retry and jittered
+            max_backoff: cap on a single retry delay
+            timeout: per-request timeout in seconds
+            auto_batch: group concurrent single calls into batch requests
+            batch_window: how long to wait for more calls before sending a batch
+            max_batch_size: most calls per batch request
+        """
+        self.generator_url = generator_url.rstrip('/')
+        self.predictor_url = predictor_url.rstrip('/')
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=max_concurrency, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+
+        self.auto_batch = auto_batch
+        self._generate_batcher = None
+        self._predict_batcher = None
+        if auto_batch:
+            in_flight = max(1, max_concurrency // 2)
+            self._generate_batcher = _Batcher(self._split_generations, batch_window, max_batch_size, in_flight)
+            self._predict_batcher = _Batcher(self._split_predictions, batch_window, max_batch_size, in_flight)
+
+    # -- plumbing -------------------------------------------------------
+
+    def _split_generations(self, specs):
+        """/generate_batch items, with smart ones renamed to /generate_smart's 'tweet' key."""
+        results = self.generate_batch(specs)['results']
+        for spec, result in zip(specs, results):
+            if spec.get('kind') == 'smart' and 'generated_tweet' in result:
+                result['tweet'] = result.pop('generated_tweet')
+        return results
+
+    def _split_predictions(self, rows):
+        """
+        One /predict-shaped response per row of a /predict_batch call.
+
+        /predict_batch rejects the whole batch when one row is invalid, so
+        a rejected batch is resent row by row and only the bad calls fail.
+        """
+        try:
+            response = self.predict_batch(rows)
+        except TweetClientError as e:
+            if e.status != 400 or len(rows) == 1:
+                raise
+            return [self._predict_one(row) for row in rows]
+        results = [{'predicted_likes': n} for n in response['predicted_likes']]
+        for result, interval in zip(results, response.get('predicted_likes_intervals', [])):
+            result['predicted_likes_interval'] = interval
+        return results
+
+    def _predict_one(self, row):
+        """_split_predictions for a single row; a rejection is returned as the row's result."""
+        try:
+            return self._split_predictions([row])[0]
+        except TweetClientError as e:
+            return e
+
+    def _retry_delay(self, attempt, response=None):
+        """
+        Exponential backoff with jitter. When the server sends Retry-After,
+        wait that long plus up to one backoff step, so clients told the
+        same Retry-After don't all come back at the same instant.
+        """
+        backoff = min(self.max_backoff, self.backoff * (2 ** attempt))
+        if response is not None:
+            try:
+                return float(response.headers['Retry-After']) + random.uniform(0, backoff)
+            except (KeyError, ValueError):
+                pass
+        return backoff * random.uniform(0.5, 1.5)
+
+    def _request(self, method, url, **kwargs):
+        """Send a request with bounded concurrency and retries, return its JSON."""
+        last_error = None
+        for attempt in range(self.retries + 1):
+            response = None
+            with self._slots:
+                try:
+                    response = self.session.request(method, url, timeout=self.timeout, **kwargs)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    last_error = TweetClientError(f"{method} {url} failed: {e}")
+
+            if response is not None:
+                if response.status_code not in RETRY_STATUSES:
+                    try:
+                        data = response.json()
+                    except ValueError:
+                        data = None
+                    if response.status_code >= 400 or data is None:
+                        message = (data or {}).get('error') or f"HTTP {response.status_code}"
+                        raise TweetClientError(message, status=response.status_code, payload=data)
+                    return data
+                last_error = TweetClientError(
+                    f"{method} {url} returned HTTP {response.status_code}", status=response.status_code)
+
+            if attempt < self.retries:
+                time.sleep(self._retry_delay(attempt, response))
+
+        raise last_error
+
+    def _post_generator(self, route, payload):
+        return self._request('POST', f"{self.generator_url}/{route}", json=payload)
+
+    @staticmethod
+    def _strip_none(params):
+        return {k: v for k, v in params.items() if v is not None}
+
+    # -- generator API --------------------------------------------------
+
+    def generate(self, company, tweet_type=None, message=None, topic=None, has_media=None, hour=None):
+        spec = self._strip_none(dict(company=company, tweet_type=tweet_type, message=message, topic=topic))
+        if self.auto_batch:
+            spec.update(self._strip_none(dict(kind='template', has_media=has_media, hour=hour)))
+            return self._generate_batcher.submit(spec).result()
+        return self._post_generator('generate', spec)
+
+    def generate_branded(self, company, industry=None, brand_voice=None, message=None, topic=None,
+                         has_media=None, hour=None):
+        spec = self._strip_none(dict(company=company, industry=industry, brand_voice=brand_voice,
+                                     message=message, topic=topic))
+        if self.auto_batch:
+            spec.update(self._strip_none(dict(kind='branded', has_media=has_media, hour=hour)))
+            return self._generate_batcher.submit(spec).result()
+        return self._post_generator('generate_branded', spec)
+
+    def generate_smart(self, company, message=None, topic=None, word_count_target=None,
+                       sentiment_target=None, has_media=None, optimal_hour=None):
+        spec = self._strip_none(dict(company=company, message=message, topic=topic,
+                                     word_count_target=word_count_target, sentiment_target=sentiment_target,
+                                     has_media=has_media, optimal_hour=optimal_hour))
+        if self.auto_batch:
+            spec['kind'] = 'smart'
+            return self._generate_batcher.submit(spec).result()
+        return self._post_generator('generate_smart', spec)
+
+    def optimize_tweet(self, company, message=None, topic=None):
+        return self._post_generator('optimize_tweet', self._strip_none(
+            dict(company=company, message=message, topic=topic)))
+
+    def generate_ai(self, company, topic=None, message=None, deadline_ms=None):
+        """GPT-2 tweet within deadline_ms; the response's 'path' says if a fallback wrote it."""
+        return self._post_generator('generate_ai', self._strip_none(
+            dict(company=company, topic=topic, message=message, deadline_ms=deadline_ms)))
+
+    def generate_and_predict(self, company, tweet_type=None, message=None, topic=None,
+                             has_media=None, hour=None):
+        return self._post_generator('generate_and_predict', self._strip_none(
+            dict(company=company, tweet_type=tweet_type, message=message, topic=topic,
+                 has_media=has_media, hour=hour)))
+
+    def generate_batch(self, specs):
+        """Send specs to /generate_batch as-is and return the full response."""
+        return self._post_generator('generate_batch', {'specs': list(specs)})
+
+    def schedule(self, drafts, days=None, window=None, min_spacing_hours=None,
+                 max_posts_per_hour=None, start_date=None, method=None):
+        """Ask /schedule for posting times for many drafts."""
+        payload = self._strip_none(dict(days=days, window=window, min_spacing_hours=min_spacing_hours,
+                                        max_posts_per_hour=max_posts_per_hour, start_date=start_date,
+                                        method=method))
+        payload['drafts'] = list(drafts)
+        return self._post_generator('schedule', payload)
+
+    def health(self):
+        return self._request('GET', f"{self.generator_url}/health")
+
+    # -- like predictor API ---------------------------------------------
+
+    def predict(self, word_count, char_count, has_media, hour, sentiment):
+        features = dict(word_count=word_count, char_count=char_count, has_media=int(has_media),
+                        hour=hour, sentiment=sentiment)
+        if self.auto_batch:
+            return self._predict_batcher.submit(features).result()
+        return self._request('POST', f"{self.predictor_url}/predict", json=features)
+
+    def predict_batch(self, rows):
+        """Predict likes for many feature dicts in one request."""
+        rows = list(rows)
+        for row in rows:
+            missing = [name for name in FEATURE_NAMES if name not in row]
+            if missing:
+                raise TweetClientError(f"Missing features: {', '.join(missing)}")
+        return self._request('POST', f"{self.predictor_url}/predict_batch", json={'instances': rows})
+
+    # -- lifecycle ------------------------------------------------------
+
+    def close(self):
+        for batcher in (self._generate_batcher, self._predict_batcher):
+            if batcher is not None:
+                batcher.close()
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class AsyncTweetClient:
+    """
+    asyncio interface over TweetClient.
+
+    Requests run on a thread pool sized to max_concurrency, so at most that
+    many are in flight. With auto_batch=True, single calls are awaited on
+    the batcher's futures directly and do not hold a thread while waiting.
+    """
+
+    def __init__(self, *args, max_concurrency=16, **kwargs):
+        self._client = TweetClient(*args, max_concurrency=max_concurrency, **kwargs)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='tweet-client')
+
+    async def _call(self, method, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: method(*args, **kwargs))
+
+    async def _batched(self, batcher, payload):
+        return await asyncio.wrap_future(batcher.submit(payload))
+
+    async def generate(self, company, **params):
+        if self._client.auto_batch:
+            spec = self._client._strip_none(dict(company=company, kind='template', **params))
+            return await self._batched(self._client._generate_batcher, spec)
+        return await self._call(self._client.generate, company, **params)
+
+    async def generate_branded(self, company, **params):
+        if self._client.auto_batch:
+            spec = self._client._strip_none(dict(company=company, kind='branded', **params))
+            return await self._batched(self._client._generate_batcher, spec)
+        return await self._call(self._client.generate_branded, company, **params)
+
+    async def generate_smart(self, company, **params):
+        if self._client.auto_batch:
+            spec = self._client._strip_none(dict(company=company, kind='smart', **params))
+            return await self._batched(self._client._generate_batcher, spec)
+        return await self._call(self._client.generate_smart, company, **params)
+
+    async def optimize_tweet(self, company, **params):
+        return await self._call(self._client.optimize_tweet, company, **params)
+
+    async def generate_ai(self, company, **params):
+        return await self._call(self._client.generate_ai, company, **params)
+
+    async def generate_and_predict(self, company, **params):
+        return await self._call(self._client.generate_and_predict, company, **params)
+
+    async def generate_batch(self, specs):
+        return await self._call(self._client.generate_batch, specs)
+
+    async def schedule(self, drafts, **params):
+        return await self._call(self._client.schedule, drafts, **params)
+
+    async def health(self):
+        return await self._call(self._client.health)
+
+    async def predict(self, word_count, char_count, has_media, hour, sentiment):
+        if self._client.auto_batch:
+            features = dict(word_count=word_count, char_count=char_count, has_media=int(has_media),
+                            hour=hour, sentiment=sentiment)
+            return await self._batched(self._client._predict_batcher, features)
+        return await self._call(self._client.predict, word_count, char_count, has_media, hour, sentiment)
+
+    async def predict_batch(self, rows):
+        return await self._call(self._client.predict_batch, rows)
+
+    async def close(self):
+        await asyncio.get_running_loop().run_in_executor(None, self._client.close)
+        self._executor.shutdown(wait=False)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
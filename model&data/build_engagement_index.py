@@ -0,0 +1,138 @@
+"""
+Build the historical engagement index from the training corpus.
+
+Aggregates data.csv into like statistics (count, median, p90, mean) per
+company, posting hour, day of week, media presence and frequent
+hashtags/terms, and writes them as:
+
+    engagement_index/
+        stats.npy   float32 array, one row per key: count, median, p90, mean
+        meta.json   key -> row lookup for every dimension, plus overall stats
+
+stats.npy is loaded memory-mapped by api/engagement_index.py, so the APIs
+never rescan the CSV.
+
+Usage:
+    python build_engagement_index.py --data data.csv --out engagement_index
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from ingest import DEFAULT_CHUNKSIZE, read_tweets
+
+COLUMNS = ['count', 'median', 'p90', 'mean']
+
+DAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+TERM_PATTERN = r"#?[a-z][a-z0-9_']{2,}"
+
+# Placeholders from the export plus very common words with no signal
+STOPWORDS = {
+    'mention', 'hyperlink', 'url', 'http', 'https', 'the', 'and', 'for', 'you',
+    'your', 'with', 'this', 'that', 'are', 'our', 'from', 'have', 'has', 'was',
+    'will', 'can', 'all', 'but', 'not', 'out', 'its', "it's", 'just', 'more',
+    'about', 'what', 'who', 'how', 'when', 'get', 'new', 'now', 'they', 'their',
+    'them', 'his', 'her', 'she', 'him', 'been', 'were', 'would', 'there', 'into',
+}
+
+
+def load_corpus(path, chunksize=DEFAULT_CHUNKSIZE):
+    """Read data.csv with compact dtypes (see ingest.py); company is already normalized."""
+    return read_tweets(path, chunksize)
+
+
+def aggregate(likes, keys):
+    """count / median / p90 / mean of likes for every value of keys."""
+    grouped = likes.groupby(keys, observed=True)
+    stats = pd.DataFrame({
+        'count': grouped.size(),
+        'median': grouped.median(),
+        'p90': grouped.quantile(0.9),
+        'mean': grouped.mean(),
+    })
+    return stats[COLUMNS]
+
+
+def build_index(df, top_terms=500, min_term_count=20):
+    """
+    Compute per-dimension statistics.
+
+    Args:
+        df: corpus from load_corpus
+        top_terms: keep at most this many hashtags/terms
+        min_term_count: drop terms seen in fewer tweets than this
+
+    Returns:
+        (stats array, meta dict)
+    """
+    likes = df['likes'].astype(float)
+    dated = df['hour'].notna()
+
+    tables = {
+        'company': aggregate(likes, df['company']),
+        'hour': aggregate(likes[dated], df.loc[dated, 'hour'].astype(int)),
+        'day_of_week': aggregate(likes[dated], df.loc[dated, 'day_of_week'].astype(int).map(dict(enumerate(DAYS)))),
+        'has_media': aggregate(likes, df['has_media'].astype(int)),
+    }
+
+    # Count each term once per tweet
+    terms = df['content'].str.findall(TERM_PATTERN).map(set).explode().dropna()
+    terms = terms[~terms.isin(STOPWORDS)]
+    term_likes = likes.loc[terms.index]
+    term_stats = aggregate(term_likes.reset_index(drop=True), terms.reset_index(drop=True))
+    term_stats = term_stats[term_stats['count'] >= min_term_count]
+    tables['term'] = term_stats.sort_values('count', ascending=False).head(top_terms)
+
+    rows = []
+    dimensions = {}
+    for name, table in tables.items():
+        keys = [str(key) for key in table.index]
+        dimensions[name] = {'offset': len(rows), 'keys': keys}
+        rows.extend(table.to_numpy())
+
+    meta = {
+        'columns': COLUMNS,
+        'rows': int(len(df)),
+        'dimensions': dimensions,
+        'overall': {
+            'count': int(len(likes)),
+            'median': float(likes.median()),
+            'p90': float(likes.quantile(0.9)),
+            'mean': float(likes.mean()),
+        },
+    }
+    return np.asarray(rows, dtype=np.float32), meta
+
+
+def write_index(stats, meta, out_dir):
+    os.makedirs(out_dir, exist_ok=True)
+    np.save(os.path.join(out_dir, 'stats.npy'), stats)
+    with open(os.path.join(out_dir, 'meta.json'), 'w') as f:
+        json.dump(meta, f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the historical engagement index.")
+    parser.add_argument('--data', default='data.csv', help="Training corpus CSV")
+    parser.add_argument('--out', default='engagement_index', help="Output directory")
+    parser.add_argument('--top-terms', type=int, default=500)
+    parser.add_argument('--min-term-count', type=int, default=20)
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help="Rows per CSV chunk")
+    args = parser.parse_args()
+
+    df = load_corpus(args.data, args.chunksize)
+    stats, meta = build_index(df, args.top_terms, args.min_term_count)
+    write_index(stats, meta, args.out)
+
+    size_kb = os.path.getsize(os.path.join(args.out, 'stats.npy')) / 1024
+    print(f"Indexed {meta['rows']} tweets into {len(stats)} keys ({size_kb:.1f} KB) at {args.out}/")
+    for name, dim in meta['dimensions'].items():
+        print(f"  {name}: {len(dim['keys'])} keys")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""
+Search for a smaller, faster like predictor at the same accuracy.
+
+Rebuilds the features from data.csv exactly as initialize.ipynb does, uses
+the same train/validation split (test_size=0.2, random_state=42) and fits a
+set of compact alternatives to the default RandomForestRegressor(): fewer
+or shallower trees, larger leaves, and histogram gradient boosting.
+
+For every candidate it reports:
+    - artifact size of the joblib pickle
+    - load time of that pickle
+    - single-row and batch (whole validation set) prediction latency
+    - validation RMSE
+
+The chosen model is the smallest artifact whose RMSE is within --tolerance
+of the baseline forest. It is only written when --export is given.
+
+Usage:
+    python compact_model.py --data data.csv
+    python compact_model.py --data data.csv --tolerance 0.02 --export like_predictor.pkl
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import joblib
+import numpy as np
+from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
+from sklearn.metrics import mean_squared_error
+from sklearn.model_selection import train_test_split
+from textblob import TextBlob
+
+from ingest import DEFAULT_CHUNKSIZE, read_tweets
+
+# Same column order the model was trained with in initialize.ipynb
+FEATURES = ['has_media', 'char_count', 'word_count', 'hour', 'sentiment']
+
+CANDIDATES = {
+    'baseline_rf': lambda: RandomForestRegressor(random_state=42),
+    'rf_50_depth12': lambda: RandomForestRegressor(n_estimators=50, max_depth=12, random_state=42),
+    'rf_50_leaf20': lambda: RandomForestRegressor(n_estimators=50, min_samples_leaf=20, random_state=42),
+    'rf_30_depth10_leaf10': lambda: RandomForestRegressor(
+        n_estimators=30, max_depth=10, min_samples_leaf=10, random_state=42),
+    'rf_20_depth8_leaf20': lambda: RandomForestRegressor(
+        n_estimators=20, max_depth=8, min_samples_leaf=20, random_state=42),
+    'rf_100_leaf50': lambda: RandomForestRegressor(n_estimators=100, min_samples_leaf=50, random_state=42),
+    'hist_gb_100': lambda: HistGradientBoostingRegressor(max_iter=100, random_state=42),
+    'hist_gb_200_leaf31': lambda: HistGradientBoostingRegressor(
+        max_iter=200, max_leaf_nodes=31, learning_rate=0.05, random_state=42),
+}
+
+
+def load_features(path, chunksize=DEFAULT_CHUNKSIZE):
+    """Reproduce the notebook's cleaning and feature extraction."""
+    df = read_tweets(path, chunksize)
+    df = df.dropna(subset=['username'])
+    # Python's split, as the notebook and FeatureBatch use: regex \S (RE2 in
+    # the Arrow kernels) counts NBSP and other Unicode spaces as word characters
+    df['word_count'] = df['content'].map(lambda x: len(x.split())).astype('int32')
+    df['char_count'] = df['content'].str.len().astype('int32')
+    df['has_media'] = df['has_media'].astype('int8')
+    df['sentiment'] = df['content'].map(lambda x: TextBlob(x).sentiment.polarity)
+    return df[FEATURES], df['likes']
+
+
+def median_latency(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return float(np.median(timings))
+
+
+def evaluate(name, model, X_val, y_val, workdir, repeats=50):
+    """Measure one fitted candidate."""
+    path = os.path.join(workdir, f'{name}.pkl')
+    joblib.dump(model, path)
+    size = os.path.getsize(path)
+
+    started = time.perf_counter()
+    loaded = joblib.load(path)
+    load_time = time.perf_counter() - started
+
+    X = X_val.to_numpy(dtype=np.float64)
+    row = X[:1]
+    single = median_latency(lambda: loaded.predict(row), repeats)
+    batch = median_latency(lambda: loaded.predict(X), max(3, repeats // 10))
+
+    rmse = float(np.sqrt(mean_squared_error(y_val, loaded.predict(X))))
+
+    return {
+        'name': name,
+        'size_mb': round(size / 1e6, 3),
+        'load_ms': round(load_time * 1000, 2),
+        'single_row_ms': round(single * 1000, 3),
+        'batch_ms': round(batch * 1000, 2),
+        'batch_rows': len(X),
+        'rmse': round(rmse, 2),
+        'path': path,
+    }
+
+
+def choose(results, tolerance):
+    """Smallest artifact whose RMSE is within tolerance of the baseline."""
+    baseline = next(r for r in results if r['name'] == 'baseline_rf')
+    limit = baseline['rmse'] * (1 + tolerance)
+    eligible = [r for r in results if r['rmse'] <= limit]
+    return min(eligible, key=lambda r: (r['size_mb'], r['single_row_ms']))
+
+
+def print_table(results, chosen):
+    print(f"\n{'candidate':<24}{'size MB':>10}{'load ms':>10}{'1-row ms':>10}{'batch ms':>10}{'RMSE':>12}")
+    print("-" * 76)
+    for r in results:
+        marker = '  <- chosen' if r['name'] == chosen['name'] else ''
+        print(f"{r['name']:<24}{r['size_mb']:>10}{r['load_ms']:>10}{r['single_row_ms']:>10}"
+              f"{r['batch_ms']:>10}{r['rmse']:>12}{marker}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare compact like predictor models.")
+    parser.add_argument('--data', default='data.csv', help="Training corpus CSV")
+    parser.add_argument('--tolerance', type=float, default=0.01,
+                        help="Allowed relative RMSE increase over the baseline (0.01 = 1%%)")
+    parser.add_argument('--only', help="Comma-separated candidate names to run")
+    parser.add_argument('--export', help="Write the chosen model to this path")
+    parser.add_argument('--json', help="Write the report as JSON to this path")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help="Rows per CSV chunk")
+    args = parser.parse_args()
+
+    X, y = load_features(args.data, args.chunksize)
+    X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=0.2, random_state=42)
+
+    names = args.only.split(',') if args.only else list(CANDIDATES)
+    if 'baseline_rf' not in names:
+        names.insert(0, 'baseline_rf')
+
+    workdir = tempfile.mkdtemp(prefix='compact_model_')
+    results = []
+    for name in names:
+        print(f"Fitting {name}...")
+        model = CANDIDATES[name]()
+        # Fit on plain arrays so the exported model does not expect column names
+        model.fit(X_train.to_numpy(dtype=np.float64), y_train)
+        results.append(evaluate(name, model, X_val, y_val, workdir))
+
+    chosen = choose(results, args.tolerance)
+    print_table(results, chosen)
+
+    if args.export:
+        joblib.dump(joblib.load(chosen['path']), args.export)
+        print(f"\nExported {chosen['name']} to {args.export}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'tolerance': args.tolerance, 'chosen': chosen['name'], 'candidates': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+"""
+Memory-lean loading of the training CSV.
+
+initialize.ipynb reads every column of data.csv with default dtypes,
+parses dates without a format and cleans content with object-dtype
+string ops. read_tweets() loads the same rows with only the needed
+columns and compact dtypes:
+
+    likes        int32
+    content      Arrow-backed string, stripped and lowercased
+    username     category
+    company      category (inferred company, stripped and lowercased)
+    has_media    bool
+    hour         Int8 (int8 values, missing for unparseable dates)
+    day_of_week  Int8 (0 = Monday)
+
+Dates are parsed with the export's fixed format. The file is streamed
+in chunks and the media column (long preview URLs) is reduced to
+has_media chunk by chunk, so only one chunk of raw text is in memory at
+a time; reading the whole file at once holds every raw column and peaks
+higher than streaming.
+
+Run on its own, it compares load time, peak RSS and frame size against
+the notebook's approach, each in a fresh process:
+
+Usage:
+    python ingest.py --data data.csv
+    python ingest.py --data data.csv --chunksize 500000 --json ingest_report.json
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+try:
+    import pyarrow  # noqa: F401
+    STRING_DTYPE = 'string[pyarrow]'
+except ImportError:
+    STRING_DTYPE = 'string'
+
+# Format of the 'date' column in the export, e.g. 2020-12-12 00:47:00
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+USECOLS = ['date', 'likes', 'content', 'username', 'media', 'inferred company']
+READ_DTYPES = {
+    'date': STRING_DTYPE,
+    'likes': 'float64',  # may be missing; cast to int32 once those rows are dropped
+    'content': STRING_DTYPE,
+    'username': 'category',
+    'media': STRING_DTYPE,
+    'inferred company': 'category',
+}
+CATEGORICAL = ['username', 'company']
+
+# Rows per chunk; a few hundred MB of raw text at most
+DEFAULT_CHUNKSIZE = 200_000
+
+
+def normalize_category(series):
+    """Strip and lowercase a categorical's categories, merging any that collide; sorted."""
+    categories = series.cat.categories.astype(str).str.strip().str.lower()
+    merged = pd.Index(categories).unique().sort_values()
+    remap = merged.get_indexer(categories)
+    codes = series.cat.codes.to_numpy()
+    codes = np.where(codes >= 0, remap[codes], -1)
+    return pd.Series(pd.Categorical.from_codes(codes, categories=merged), index=series.index)
+
+
+def clean_chunk(raw):
+    """Turn raw CSV columns into the compact frame described above."""
+    raw = raw.dropna(subset=['content', 'inferred company', 'likes'])
+
+    dates = pd.to_datetime(raw['date'], format=DATE_FORMAT, errors='coerce')
+    return pd.DataFrame({
+        'likes': raw['likes'].astype('int32'),
+        'content': raw['content'].str.strip().str.lower(),
+        'username': raw['username'],
+        'company': normalize_category(raw['inferred company']),
+        'has_media': (raw['media'].fillna('no_media') != 'no_media').astype(bool),
+        'hour': dates.dt.hour.astype('Int8'),
+        'day_of_week': dates.dt.dayofweek.astype('Int8'),
+    }, index=raw.index)
+
+
+def concat_chunks(chunks):
+    """Concatenate cleaned chunks, keeping the categorical columns categorical."""
+    if len(chunks) == 1:
+        return chunks[0]
+    df = pd.concat([chunk.drop(columns=CATEGORICAL) for chunk in chunks])
+    for column in CATEGORICAL:
+        df[column] = pd.Series(union_categoricals([chunk[column] for chunk in chunks], sort_categories=True), index=df.index)
+    return df[chunks[0].columns]
+
+
+def read_tweets(path, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Load data.csv into a compact frame.
+
+    Args:
+        path: training corpus CSV
+        chunksize: rows per chunk to stream the file in; None reads it in one go
+
+    Returns:
+        DataFrame with likes, content, username, company, has_media, hour
+        and day_of_week, without rows missing content, company or likes
+    """
+    reader = pd.read_csv(path, usecols=USECOLS, dtype=READ_DTYPES, chunksize=chunksize)
+    if chunksize is None:
+        return clean_chunk(reader)
+    return concat_chunks([clean_chunk(chunk) for chunk in reader])
+
+
+def read_tweets_notebook(path):
+    """The notebook's loading and cleaning, kept as the baseline for the report."""
+    df = pd.read_csv(path)
+    df.dropna(subset=['content', 'inferred company', 'likes'], inplace=True)
+    df['media'] = df['media'].fillna('no_media')
+    df['has_media'] = df['media'].apply(lambda x: x != 'no_media')
+    df['content'] = df['content'].astype(str).str.strip().str.lower()
+    df['datetime'] = pd.to_datetime(df['date'], errors='coerce')
+    df['hour'] = df['datetime'].dt.hour
+    df['day_of_week'] = df['datetime'].dt.dayofweek
+    return df
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far (ru_maxrss is kB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def child(method, path, chunksize):
+    """Load once with one method and print one JSON line of measurements."""
+    before = peak_rss_mb()
+    started = time.perf_counter()
+    df = read_tweets_notebook(path) if method == 'notebook' else read_tweets(path, chunksize)
+    elapsed = time.perf_counter() - started
+    print(json.dumps({
+        'method': method,
+        'rows': len(df),
+        'load_s': round(elapsed, 3),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'peak_rss_growth_mb': round(peak_rss_mb() - before, 1),
+        'frame_mb': round(df.memory_usage(deep=True).sum() / 1e6, 1),
+    }))
+
+
+def measure(method, path, chunksize):
+    """Run one method in a fresh process so peak RSS is not shared between them."""
+    command = [sys.executable, os.path.abspath(__file__), '--data', path, '--child', method,
+               '--chunksize', str(chunksize)]
+    output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def print_table(results):
+    print(f"\n{'method':<16}{'rows':>10}{'load s':>10}{'peak RSS MB':>14}{'RSS growth MB':>16}{'frame MB':>11}")
+    print("-" * 77)
+    for r in results:
+        print(f"{r['method']:<16}{r['rows']:>10}{r['load_s']:>10}{r['peak_rss_mb']:>14}"
+              f"{r['peak_rss_growth_mb']:>16}{r['frame_mb']:>11}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare lean CSV ingestion with the notebook's.")
+    parser.add_argument('--data', default='data.csv', help="Training corpus CSV")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help="Rows per chunk when streaming")
+    parser.add_argument('--json', help="Write the report as JSON to this path")
+    parser.add_argument('--child', choices=['notebook', 'lean', 'lean_chunked'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.data, args.chunksize if args.child == 'lean_chunked' else None)
+        return
+
+    methods = ['notebook', 'lean', 'lean_chunked']
+    results = [measure(method, args.data, args.chunksize) for method in methods]
+    print_table(results)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'data': args.data, 'chunksize': args.chunksize, 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
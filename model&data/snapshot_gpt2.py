@@ -0,0 +1,176 @@
+"""
+Snapshot GPT-2 for offline, memory-mapped loading.
+
+AITweetGenerator normally resolves 'gpt2' through the Hugging Face hub
+cache, which needs the network on a cold cache. This writes the
+tokenizer, config and weights (as model.safetensors) to a local
+directory; with AI_MODEL_DIR pointing at it the generator loads offline
+and maps the weights instead of copying them, so API workers share one
+copy in the page cache.
+
+--assistant also saves a draft model for assisted decoding into
+<out>/assistant/<name>; it is only used when AI_ASSISTANT_MODEL names
+it. --measure starts fresh processes that construct AITweetGenerator
+from the hub cache and from the snapshot and reports import and load
+time, RSS (split into anonymous and file-backed memory) and PSS, which
+divides shared pages between the processes using them. --processes
+starts several at once to show the sharing.
+
+Usage:
+    python snapshot_gpt2.py --out gpt2_snapshot
+    python snapshot_gpt2.py --out gpt2_snapshot --assistant distilgpt2 --measure --processes 4
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def write_snapshot(out, model_name='gpt2', assistant=None):
+    """Save tokenizer, config and safetensors weights of model_name (and the draft model) to out."""
+    from transformers import AutoModelForCausalLM, AutoTokenizer
+
+    AutoTokenizer.from_pretrained(model_name).save_pretrained(out)
+    AutoModelForCausalLM.from_pretrained(model_name).save_pretrained(out, safe_serialization=True)
+    if assistant:
+        AutoModelForCausalLM.from_pretrained(assistant).save_pretrained(
+            os.path.join(out, 'assistant', assistant), safe_serialization=True
+        )
+
+    return sum(
+        os.path.getsize(os.path.join(folder, name))
+        for folder, _, names in os.walk(out) for name in names
+    )
+
+
+def memory_kb():
+    """RSS, its anonymous and file-backed parts, and PSS of this process in kB (Linux)."""
+    fields = {}
+    with open('/proc/self/status') as f:
+        for line in f:
+            name, _, value = line.partition(':')
+            if name in ('VmRSS', 'RssAnon', 'RssFile'):
+                fields[name] = int(value.split()[0])
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                if line.startswith('Pss:'):
+                    fields['Pss'] = int(line.split()[1])
+    except OSError:
+        fields['Pss'] = None
+    return fields
+
+
+def child(source, hold):
+    """Construct the generator, print one JSON line of measurements, then wait for stdin to close."""
+    sys.path.insert(0, os.path.join(ROOT, 'tweet_generators'))
+    if source == 'hub':
+        os.environ.pop('AI_MODEL_DIR', None)
+
+    start = time.perf_counter()
+    from genenerator_ai import AITweetGenerator
+    import_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    generator = AITweetGenerator()
+    init_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    generator.generate_ai_tweet("Excited to announce", max_length=30)
+    first_s = time.perf_counter() - start
+
+    print(json.dumps({'import_s': import_s, 'init_s': init_s, 'first_tweet_s': first_s, **memory_kb()}), flush=True)
+    if hold:
+        # Stay alive so the sibling processes are measured while this one still maps the weights
+        sys.stdin.read()
+
+
+def measure(source, snapshot_dir, processes):
+    """Start `processes` children together; return their reports."""
+    env = dict(os.environ, HF_HUB_OFFLINE='1', TRANSFORMERS_OFFLINE='1')
+    if source == 'snapshot':
+        env['AI_MODEL_DIR'] = os.path.abspath(snapshot_dir)
+    hold = ['--hold'] if processes > 1 else []
+
+    procs = [
+        subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), '--child', source] + hold,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, env=env, text=True
+        )
+        for _ in range(processes)
+    ]
+    reports = []
+    for proc in procs:
+        line = proc.stdout.readline()
+        reports.append(json.loads(line) if line else None)
+    for proc in procs:
+        proc.stdin.close()
+        proc.wait()
+    return reports
+
+
+def summarize(source, reports):
+    ok = [r for r in reports if r]
+    if not ok:
+        return {'source': source, 'failed': len(reports)}
+    mean = lambda key: sum(r[key] for r in ok) / len(ok)
+    pss = [r['Pss'] for r in ok if r.get('Pss') is not None]
+    return {
+        'source': source,
+        'processes': len(ok),
+        'failed': len(reports) - len(ok),
+        'import_s': round(mean('import_s'), 2),
+        'init_s': round(mean('init_s'), 2),
+        'first_tweet_s': round(mean('first_tweet_s'), 2),
+        'rss_mb': round(mean('VmRSS') / 1024, 1),
+        'rss_anon_mb': round(mean('RssAnon') / 1024, 1),
+        'rss_file_mb': round(mean('RssFile') / 1024, 1),
+        'total_pss_mb': round(sum(pss) / 1024, 1) if pss else None,
+    }
+
+
+def print_table(rows):
+    header = ('source', 'processes', 'import_s', 'init_s', 'first_tweet_s', 'rss_mb', 'rss_anon_mb', 'rss_file_mb',
+              'total_pss_mb')
+    print('  '.join(f'{name:>13}' for name in header))
+    for row in rows:
+        print('  '.join(f'{str(row.get(name, "-")):>13}' for name in header))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--out', default='gpt2_snapshot', help='snapshot directory to write')
+    parser.add_argument('--model', default='gpt2')
+    parser.add_argument('--assistant', help='also snapshot this draft model (e.g. distilgpt2)')
+    parser.add_argument('--skip-write', action='store_true', help='measure an existing snapshot')
+    parser.add_argument('--measure', action='store_true', help='compare startup time and memory, hub vs snapshot')
+    parser.add_argument('--processes', type=int, default=1, help='processes started at once when measuring')
+    parser.add_argument('--json', action='store_true', help='print the measurements as JSON')
+    parser.add_argument('--child', choices=['hub', 'snapshot'], help=argparse.SUPPRESS)
+    parser.add_argument('--hold', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.hold)
+        return
+
+    if not args.skip_write:
+        start = time.perf_counter()
+        size = write_snapshot(args.out, args.model, args.assistant)
+        print(f"Wrote {args.out} ({size / 1e6:.1f} MB) in {time.perf_counter() - start:.1f}s")
+        print(f"Serve from it with AI_MODEL_DIR={os.path.abspath(args.out)}")
+
+    if args.measure:
+        rows = [summarize(source, measure(source, args.out, args.processes)) for source in ('hub', 'snapshot')]
+        if args.json:
+            print(json.dumps(rows, indent=2))
+        else:
+            print_table(rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,12 @@
-import datetime
+import random
+
 import joblib
-import numpy as np
+import pandas as pd
 import streamlit as st
-from textblob import TextBlob
 
 from advanced_generator import AdvancedTweetGenerator
-from generator import SimpleTweetGenerator
+from features import FeatureBatch
+from generator_simple import SimpleTweetGenerator
 
 # The AI generator is optional because loading GPT-2 is heavy.
 try:
@@ -45,44 +46,149 @@ def get_ai_generator():
         return None
 
 
+GENERATOR_TYPES = [
+    "Template (simple)",
+    "Advanced (brand voice)",
+    "Advanced (smart/optimized)",
+    "AI (GPT-2)",
+]
+
+
 def extract_features(tweet_text: str, has_media: bool, hour: int | None):
-    """Derive model features from tweet text and metadata."""
-    if hour is None:
-        hour = datetime.datetime.now().hour
-
-    word_count = len(tweet_text.split())
-    char_count = len(tweet_text)
-    sentiment = TextBlob(tweet_text).sentiment.polarity
-
-    return {
-        "word_count": word_count,
-        "char_count": char_count,
-        "has_media": int(has_media),
-        "hour": hour,
-        "sentiment": round(sentiment, 3),
-    }
+    """Derive model features from tweet text and metadata, sentiment unrounded."""
+    return FeatureBatch.from_texts([tweet_text], has_media=has_media, hour=hour).record(0, ndigits=None)
 
 
-def predict_likes(model, features: dict[str, float]) -> int | None:
-    """Run the like predictor model with consistent feature ordering."""
-    if model is None:
-        return None
+def predict_likes(model, features: dict[str, float]) -> tuple[int | None, dict | None]:
+    """
+    Run the like predictor once for the estimate and its interval.
 
-    vector = np.array(
-        [
-            features["word_count"],
-            features["char_count"],
-            features["has_media"],
-            features["hour"],
-            features["sentiment"],
-        ]
-    ).reshape(1, -1)
+    Returns:
+        (likes or None, 10th/50th/90th percentile of the forest's per-tree
+        predictions or None if the model has no trees)
+    """
+    if model is None:
+        return None, None
 
     try:
-        return int(model.predict(vector)[0])
+        predictions, intervals = FeatureBatch.from_records([features]).predict_with_intervals(model)
     except Exception as exc:
         st.error(f"Prediction failed: {exc}")
-        return None
+        return None, None
+    return int(predictions[0]), intervals[0] if intervals else None
+
+
+def generate_tweet_for(generator_type: str, inputs: dict, rng: random.Random | None = None):
+    """
+    Generate one tweet with the chosen generator.
+
+    rng drives the template generators' choices; GPT-2 samples on its own.
+
+    Returns:
+        (tweet text or None, smart generator result or None)
+    """
+    if generator_type.startswith("Template"):
+        generator = get_simple_generator()
+        tweet = generator.generate_tweet(
+            company=inputs["company"],
+            tweet_type=inputs["tweet_type"],
+            message=inputs["message"],
+            topic=inputs["topic"],
+            rng=rng,
+        )
+        return tweet, None
+
+    if "brand voice" in generator_type:
+        generator = get_advanced_generator()
+        tweet = generator.generate_branded_tweet(
+            company=inputs["company"],
+            industry=inputs["industry"],
+            brand_voice=inputs["brand_voice"],
+            message=inputs["message"],
+            topic=inputs["topic"],
+            rng=rng,
+        )
+        return tweet, None
+
+    if "smart" in generator_type:
+        generator = get_advanced_generator()
+        smart_result = generator.generate_smart_tweet(
+            company=inputs["company"],
+            message=inputs["message"],
+            topic=inputs["topic"],
+            word_count_target=inputs["word_count_target"],
+            sentiment_target=inputs["sentiment_target"],
+            has_media=inputs["has_media"],
+            optimal_hour=inputs["posting_hour"],
+            rng=rng,
+        )
+        return smart_result["tweet"], smart_result
+
+    ai_gen = get_ai_generator()
+    if ai_gen is None:
+        st.error("AI generator is unavailable. Check transformers/GPT-2 setup.")
+        return None, None
+    prompt = (
+        f"A professional social media post from {inputs['company']}: "
+        f"{inputs['message']} about {inputs['topic']}."
+    )
+    return ai_gen.generate_ai_tweet(prompt), None
+
+
+@st.cache_data(show_spinner="Generating variants...")
+def generate_variants(generator_types: tuple, n_variants: int, inputs: dict, seed: int):
+    """
+    Generate n_variants drafts, spread round-robin over the generators.
+
+    Cached on all arguments, so reruns triggered by unrelated widgets reuse
+    the drafts. The seed makes a batch reproducible; bump it for new drafts.
+    It seeds a local generator, so the global random state is left alone.
+    """
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n_variants):
+        generator_type = generator_types[i % len(generator_types)]
+        tweet, _ = generate_tweet_for(generator_type, inputs, rng)
+        if tweet:
+            rows.append({"generator": generator_type, "tweet": tweet})
+    return rows
+
+
+@st.cache_data(show_spinner="Predicting likes...")
+def score_variants(tweets: tuple, has_media: bool, hour: int) -> pd.DataFrame:
+    """One feature pass and one batched model call for all drafts."""
+    batch = FeatureBatch.from_texts(list(tweets), has_media=has_media, hour=hour)
+    features = pd.DataFrame(batch.columns())
+    model = load_like_model()
+    if model is not None:
+        features["predicted_likes"] = batch.predict(model).astype(int)
+    return features
+
+
+def render_comparison(comparison: dict):
+    """Show the cached drafts of a comparison run as a sortable table."""
+    rows = generate_variants(
+        comparison["generator_types"],
+        comparison["n_variants"],
+        comparison["inputs"],
+        comparison["seed"],
+    )
+    if not rows:
+        st.warning("No variants were generated.")
+        return
+
+    inputs = comparison["inputs"]
+    tweets = tuple(row["tweet"] for row in rows)
+    scores = score_variants(tweets, inputs["has_media"], inputs["posting_hour"])
+
+    table = pd.concat([pd.DataFrame(rows), scores], axis=1)
+    if "predicted_likes" in table:
+        table = table.sort_values("predicted_likes", ascending=False, ignore_index=True)
+    else:
+        st.info("Prediction unavailable. Load the model to enable like estimates.")
+
+    st.subheader(f"{len(table)} variants")
+    st.dataframe(table, use_container_width=True, hide_index=True)
 
 
 def main():
@@ -93,15 +199,16 @@ def main():
         "the likes it might get with the trained Random Forest model."
     )
 
-    generator_type = st.sidebar.selectbox(
-        "Generator type",
-        [
-            "Template (simple)",
-            "Advanced (brand voice)",
-            "Advanced (smart/optimized)",
-            "AI (GPT-2)",
-        ],
-    )
+    mode = st.sidebar.radio("Mode", ["Single tweet", "Compare variants"])
+
+    if mode == "Single tweet":
+        generator_type = st.sidebar.selectbox("Generator type", GENERATOR_TYPES)
+        selected_types = [generator_type]
+    else:
+        selected_types = st.sidebar.multiselect(
+            "Generators to compare", GENERATOR_TYPES, default=GENERATOR_TYPES[:3]
+        )
+        n_variants = st.sidebar.slider("Number of variants", 2, 50, 20)
 
     st.sidebar.markdown("### Prediction metadata")
     has_media = st.sidebar.checkbox("Has media", value=True)
@@ -122,11 +229,11 @@ def main():
     sentiment_target = 0.6
     word_count_target = 18
 
-    if generator_type.startswith("Template"):
+    if "Template (simple)" in selected_types:
         tweet_type = st.selectbox(
             "Template style", ["general", "announcement", "question"]
         )
-    elif "brand voice" in generator_type:
+    if "Advanced (brand voice)" in selected_types:
         industry = st.selectbox(
             "Industry",
             ["tech", "food", "fashion", "fitness", "finance"],
@@ -135,7 +242,7 @@ def main():
         brand_voice = st.selectbox(
             "Brand voice", ["casual", "professional", "playful"], index=0
         )
-    elif "smart" in generator_type:
+    if "Advanced (smart/optimized)" in selected_types:
         sentiment_target = st.slider(
             "Target sentiment", -1.0, 1.0, 0.6, help="Positive tweets usually perform better"
         )
@@ -145,51 +252,48 @@ def main():
 
     model = load_like_model()
 
+    inputs = {
+        "company": company,
+        "topic": topic,
+        "message": message,
+        "tweet_type": tweet_type,
+        "industry": industry,
+        "brand_voice": brand_voice,
+        "sentiment_target": sentiment_target,
+        "word_count_target": word_count_target,
+        "has_media": has_media,
+        "posting_hour": posting_hour,
+    }
+
+    if mode == "Compare variants":
+        st.session_state.setdefault("variant_seed", 0)
+        col_generate, col_shuffle = st.columns(2)
+        generate_clicked = col_generate.button("Generate & Compare", type="primary")
+        shuffle_clicked = col_shuffle.button("New variants")
+        if shuffle_clicked:
+            st.session_state["variant_seed"] += 1
+
+        # Only a button click starts a run; other widget changes re-render the
+        # previous run from cache instead of regenerating.
+        if (generate_clicked or shuffle_clicked) and selected_types:
+            st.session_state["comparison"] = {
+                "generator_types": tuple(selected_types),
+                "n_variants": n_variants,
+                "inputs": inputs,
+                "seed": st.session_state["variant_seed"],
+            }
+        elif not selected_types:
+            st.info("Select at least one generator to compare.")
+
+        if "comparison" in st.session_state:
+            render_comparison(st.session_state["comparison"])
+        return
+
     if st.button("Generate & Predict", type="primary"):
-        generated_tweet = None
         features_from_generator = None
-        smart_result = None
-
-        if generator_type.startswith("Template"):
-            generator = get_simple_generator()
-            generated_tweet = generator.generate_tweet(
-                company=company,
-                tweet_type=tweet_type,
-                message=message,
-                topic=topic,
-            )
-        elif "brand voice" in generator_type:
-            generator = get_advanced_generator()
-            generated_tweet = generator.generate_branded_tweet(
-                company=company,
-                industry=industry,
-                brand_voice=brand_voice,
-                message=message,
-                topic=topic,
-            )
-        elif "smart" in generator_type:
-            generator = get_advanced_generator()
-            smart_result = generator.generate_smart_tweet(
-                company=company,
-                message=message,
-                topic=topic,
-                word_count_target=word_count_target,
-                sentiment_target=sentiment_target,
-                has_media=has_media,
-                optimal_hour=posting_hour,
-            )
-            generated_tweet = smart_result["tweet"]
+        generated_tweet, smart_result = generate_tweet_for(generator_type, inputs)
+        if smart_result:
             features_from_generator = smart_result.get("predicted_features", {})
-        else:
-            ai_gen = get_ai_generator()
-            if ai_gen is None:
-                st.error("AI generator is unavailable. Check transformers/GPT-2 setup.")
-            else:
-                prompt = (
-                    f"A professional social media post from {company}: "
-                    f"{message} about {topic}."
-                )
-                generated_tweet = ai_gen.generate_ai_tweet(prompt)
 
         if not generated_tweet:
             st.stop()
@@ -231,16 +335,20 @@ def main():
         features["has_media"] = int(has_media)
         features["hour"] = posting_hour
 
-        prediction = predict_likes(model, features)
+        prediction, interval = predict_likes(model, features)
 
         st.subheader("Prediction")
         if prediction is None:
             st.info("Prediction unavailable. Load the model to enable like estimates.")
         else:
             st.metric("Estimated likes", prediction)
+            if interval:
+                st.caption(f"Likely range: {interval['p10']:,} to {interval['p90']:,} likes "
+                           "(10th to 90th percentile of the forest's trees)")
 
         st.subheader("Features used")
-        st.json(features)
+        # Rounded for display only; the prediction used the full value
+        st.json({**features, "sentiment": round(features["sentiment"], 3)})
 
         if (
             generator_type.startswith("Advanced (smart")
@@ -0,0 +1,152 @@
+"""
+CPU latency of plain versus assisted (speculative) GPT-2 decoding.
+
+Runs the standard prompt set below through AITweetGenerator with and
+without the draft model, alternating modes with the same seed per prompt,
+and reports latency percentiles, the speedup and the draft model's
+acceptance rate. It then checks that the acceptance rate is within
+[0, 1] and that max_time stops decoding early on both paths, and exits
+non-zero if not. Needs transformers and torch.
+
+Examples:
+    python testing/bench_assisted.py --assistant distilgpt2
+    python testing/bench_assisted.py --assistant distilgpt2 --threads 4 --repeats 5 --max-length 80
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT, 'api'), os.path.join(ROOT, 'tweet_generators')]
+
+# Standard prompt set: (company, message, topic) as sent to /generate_ai
+PROMPTS = [
+    ('Tesla', 'revolutionary battery technology', 'electric vehicles'),
+    ('Adidas', 'launching a new running shoe', 'marathons'),
+    ('Nike', 'launching new product', 'sports'),
+    ('Starbucks', 'new seasonal drink', 'coffee'),
+    ('SpaceX', 'successful rocket landing', 'space exploration'),
+    ('Apple', 'new product launch', 'innovation'),
+    ('Microsoft', 'new AI features', 'technology'),
+    ('Our Company', 'something new', 'tech'),
+]
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+def summarize(latencies):
+    return {
+        'mean_ms': round(statistics.mean(latencies) * 1000, 1),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 1),
+    }
+
+
+def check_deadline(generator, prompt, max_length, max_time=0.1):
+    """
+    max_time has to reach generate() on both paths: with a budget far below
+    a full decode, each mode must stop early and say so.
+
+    Returns:
+        {mode: {'elapsed_ms', 'new_tokens', 'stopped_at_deadline'}}
+    """
+    results = {}
+    for mode in ('plain', 'assisted'):
+        started = time.perf_counter()
+        _, details = generator.generate_ai_tweet(
+            prompt, max_length, assisted=(mode == 'assisted'), max_time=max_time, return_details=True
+        )
+        results[mode] = {'elapsed_ms': round((time.perf_counter() - started) * 1000, 1), **details}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--assistant', default=os.environ.get('AI_ASSISTANT_MODEL') or 'distilgpt2',
+                        help="Draft model sharing GPT-2's tokenizer")
+    parser.add_argument('--repeats', type=int, default=3, help="Runs per prompt and mode")
+    parser.add_argument('--max-length', type=int, default=60)
+    parser.add_argument('--threads', type=int, help="CPU threads for torch (default: thread budget)")
+    parser.add_argument('--json', help="Write results to this file")
+    args = parser.parse_args()
+
+    import torch
+    from genenerator_ai import AITweetGenerator
+    from thread_budget import configure_threads
+
+    settings = configure_threads(cores=args.threads)
+    print(f"Loading gpt2 with draft model {args.assistant} "
+          f"({settings.get('torch_intra_op_threads')} torch threads)...")
+    generator = AITweetGenerator(assistant_model=args.assistant)
+
+    # Warm up both paths so one-off allocation isn't measured
+    for assisted in (False, True):
+        generator.generate_ai_tweet("A professional social media post", args.max_length, assisted=assisted)
+    baseline = generator.assist_stats()
+
+    latencies = {'plain': [], 'assisted': []}
+    samples = []
+    for company, message, topic in PROMPTS:
+        prompt = f"A professional social media post from {company}: {message} about {topic}."
+        for repeat in range(args.repeats):
+            for mode in ('plain', 'assisted'):
+                torch.manual_seed(repeat)
+                started = time.perf_counter()
+                tweet = generator.generate_ai_tweet(prompt, args.max_length, assisted=(mode == 'assisted'))
+                latencies[mode].append(time.perf_counter() - started)
+                if repeat == 0:
+                    samples.append((mode, company, tweet))
+
+    stats = generator.assist_stats()
+    new_tokens = stats['new_tokens'] - baseline['new_tokens']
+    target = stats['target_forwards'] - baseline['target_forwards']
+    draft = stats['draft_forwards'] - baseline['draft_forwards']
+
+    results = {mode: summarize(values) for mode, values in latencies.items()}
+    results['speedup'] = round(results['plain']['mean_ms'] / results['assisted']['mean_ms'], 2)
+    results['acceptance_rate'] = round(max(0, new_tokens - target) / draft, 3) if draft else None
+    results['tokens_per_target_forward'] = round(new_tokens / target, 2) if target else None
+
+    print(f"\n{'mode':<10}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    print("-" * 40)
+    for mode in ('plain', 'assisted'):
+        r = results[mode]
+        print(f"{mode:<10}{r['mean_ms']:>10}{r['p50_ms']:>10}{r['p95_ms']:>10}")
+    print(f"\nspeedup: {results['speedup']}x, acceptance rate: {results['acceptance_rate']}, "
+          f"tokens per gpt2 pass: {results['tokens_per_target_forward']}")
+
+    # Accepted draft tokens can't exceed the proposals the draft made
+    problems = []
+    if results['acceptance_rate'] is not None and not 0 <= results['acceptance_rate'] <= 1:
+        problems.append(f"acceptance rate {results['acceptance_rate']} is outside [0, 1]")
+
+    full_ms = min(results['plain']['p50_ms'], results['assisted']['p50_ms'])
+    deadline = check_deadline(generator, prompt, args.max_length, max_time=full_ms / 4000)
+    results['deadline_check'] = deadline
+    for mode, r in deadline.items():
+        print(f"max_time={full_ms / 4:.0f} ms, {mode}: stopped after {r['elapsed_ms']} ms, "
+              f"{r['new_tokens']} tokens, stopped_at_deadline={r['stopped_at_deadline']}")
+        if not r['stopped_at_deadline'] or r['elapsed_ms'] > full_ms / 2:
+            problems.append(f"max_time was not honoured on the {mode} path")
+
+    print("\nSample outputs:")
+    for mode, company, tweet in samples[:6]:
+        print(f"  [{mode}] {company}: {tweet}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'assistant': args.assistant, 'max_length': args.max_length,
+                       'prompts': len(PROMPTS), 'repeats': args.repeats, **results}, f, indent=2)
+
+    if problems:
+        sys.exit("FAILED: " + "; ".join(problems))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Check latency and memory of the near-duplicate index at campaign scale.
+
+Fills a NearDuplicateIndex with tweets from the template, branded and
+smart generators for many companies, then times add_if_distinct on new
+candidates and measures how many near-duplicates are caught.
+
+Example:
+    python testing/bench_dedup.py --entries 300000 --companies 500
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tweet_generators'))
+from advanced_generator import AdvancedTweetGenerator
+from dedup import NearDuplicateIndex
+from generator_simple import SimpleTweetGenerator
+
+MESSAGES = ['launching new product', 'new seasonal drink', 'breakthrough in battery technology',
+            'opening a new store', 'celebrating 10 years', 'hiring engineers', 'summer sale starts today']
+TOPICS = ['innovation', 'sports', 'coffee', 'electric vehicles', 'community', 'careers']
+
+
+def candidates(companies, seed=0):
+    """Endless stream of (company, tweet) from the repo's generators."""
+    rng = random.Random(seed)
+    simple, advanced = SimpleTweetGenerator(), AdvancedTweetGenerator()
+    while True:
+        company = f"Company {rng.randrange(companies)}"
+        message, topic = rng.choice(MESSAGES), rng.choice(TOPICS)
+        kind = rng.randrange(3)
+        if kind == 0:
+            tweet = simple.generate_tweet(company, rng.choice(['announcement', 'question', 'general']), message, topic)
+        elif kind == 1:
+            tweet = advanced.generate_branded_tweet(company, 'tech', 'casual', message, topic)
+        else:
+            tweet = advanced.generate_smart_tweet(company, message, topic, rng.randrange(8, 25),
+                                                  rng.uniform(-0.5, 0.9), False, 14)['tweet']
+        yield company, tweet
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', type=int, default=300000, help="Tweets to load into the index")
+    parser.add_argument('--companies', type=int, default=500)
+    parser.add_argument('--checks', type=int, default=5000, help="Timed add_if_distinct calls")
+    parser.add_argument('--capacity', type=int, default=200000)
+    parser.add_argument('--threshold', type=float, default=0.8)
+    args = parser.parse_args()
+
+    index = NearDuplicateIndex(capacity=args.capacity, threshold=args.threshold)
+    stream = candidates(args.companies)
+
+    print(f"Generating {args.entries} tweets for {args.companies} companies...")
+    tweets = [next(stream) for _ in range(args.entries)]
+
+    started = time.perf_counter()
+    for company, tweet in tweets:
+        index.add(tweet, company)
+    fill = time.perf_counter() - started
+
+    latencies = np.empty(args.checks)
+    duplicates = 0
+    for i in range(args.checks):
+        company, tweet = next(stream)
+        started = time.perf_counter()
+        added, _ = index.add_if_distinct(tweet, company)
+        latencies[i] = time.perf_counter() - started
+        duplicates += not added
+
+    stats = index.stats()
+    print(f"\nindex: {stats['entries']} entries (capacity {stats['capacity']}), {stats['memory_mb']} MB")
+    print(f"fill: {fill:.1f}s ({fill / args.entries * 1e6:.1f} us per add)")
+    print(f"add_if_distinct: p50 {np.percentile(latencies, 50) * 1e6:.1f} us, "
+          f"p99 {np.percentile(latencies, 99) * 1e6:.1f} us, max {latencies.max() * 1e6:.1f} us")
+    print(f"near-duplicates caught: {duplicates}/{args.checks} ({duplicates / args.checks:.1%})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+"""
+Throughput versus CPU thread settings for prediction and GPT-2 generation.
+
+Starts W worker processes at once, each configured through
+api/thread_budget.py with T threads (and forest n_jobs J), and measures
+the combined throughput of:
+
+    predict        single-row like predictions (what /predict does)
+    predict_batch  1000-row like predictions (what /generate_batch does)
+    ai             AITweetGenerator.generate_ai_tweet (needs transformers + GPT-2)
+
+Running workers x threads above the core count shows the oversubscription
+collapse the thread budget is meant to prevent.
+
+Examples:
+    python testing/bench_threads.py --workers 1,4 --threads 1,2,4
+    python testing/bench_threads.py --tasks ai --workers 2 --threads 1,2,4 --duration 30
+"""
+import argparse
+import itertools
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROMPT = "A professional social media post from Tesla: revolutionary battery technology about electric vehicles."
+
+
+def run_worker(args):
+    """Body of one worker process; prints one JSON line with its results."""
+    sys.path[:0] = [os.path.join(ROOT, 'api'), os.path.join(ROOT, 'tweet_generators')]
+    import joblib
+    import numpy as np
+    from thread_budget import configure_threads
+
+    model = joblib.load(args.model)
+    work = None
+
+    if args.task == 'ai':
+        try:
+            from genenerator_ai import AITweetGenerator
+        except ImportError as e:
+            print(json.dumps({'skipped': f'AI generator unavailable: {e}'}))
+            return
+        ai = AITweetGenerator()
+        work = lambda: ai.generate_ai_tweet(PROMPT)
+
+    settings = configure_threads(cores=args.threads * args.workers, workers=args.workers,
+                                 forest_n_jobs=args.n_jobs, model=model)
+
+    rng = np.random.default_rng(os.getpid())
+    rows = np.column_stack([
+        rng.integers(0, 2, 1000), rng.integers(10, 280, 1000), rng.integers(2, 50, 1000),
+        rng.integers(0, 24, 1000), rng.uniform(-1, 1, 1000),
+    ]).astype(np.float64)
+
+    if args.task == 'predict':
+        work = lambda: model.predict(rows[rng.integers(0, 1000):][:1])
+    elif args.task == 'predict_batch':
+        work = lambda: model.predict(rows)
+
+    # Start measuring together with the other workers
+    time.sleep(max(0.0, args.start_at - time.time()))
+    ops = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < args.duration:
+        work()
+        ops += 1
+    elapsed = time.perf_counter() - started
+
+    print(json.dumps({'ops': ops, 'seconds': elapsed, 'settings': {
+        k: settings.get(k) for k in ('intra_op_threads', 'forest_n_jobs', 'torch_intra_op_threads')
+    }}))
+
+
+def ensure_model(path):
+    if path:
+        return path
+    if os.path.exists('like_predictor.pkl'):
+        return os.path.abspath('like_predictor.pkl')
+
+    sys.path.insert(0, os.path.join(ROOT, 'testing'))
+    import load_test
+    return os.path.join(load_test.ensure_model(None), 'like_predictor.pkl')
+
+
+def run_config(args, task, workers, threads, n_jobs, model):
+    """Run `workers` processes concurrently and sum their throughput."""
+    warmup = args.warmup if task != 'ai' else max(args.warmup, 30)
+    start_at = time.time() + warmup
+    command = [sys.executable, os.path.abspath(__file__), '--worker', '--task', task,
+               '--threads', str(threads), '--workers', str(workers), '--n-jobs', str(n_jobs),
+               '--duration', str(args.duration), '--start-at', str(start_at), '--model', model]
+
+    env = dict(os.environ)
+    for var in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS'):
+        env.pop(var, None)
+
+    processes = [subprocess.Popen(command, stdout=subprocess.PIPE, text=True, env=env) for _ in range(workers)]
+    results = []
+    for process in processes:
+        out, _ = process.communicate()
+        lines = [line for line in out.splitlines() if line.startswith('{')]
+        if lines:
+            results.append(json.loads(lines[-1]))
+
+    if not results or any('skipped' in r for r in results):
+        return {'skipped': results[0]['skipped'] if results else 'worker failed'}
+
+    return {
+        'task': task,
+        'workers': workers,
+        'threads_per_worker': threads,
+        'forest_n_jobs': n_jobs,
+        'total_threads': workers * threads,
+        'throughput_ops': round(sum(r['ops'] / r['seconds'] for r in results), 2),
+    }
+
+
+def parse_list(text):
+    return [int(x) for x in text.split(',')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    cores = os.cpu_count() or 1
+    parser.add_argument('--tasks', default='predict,predict_batch,ai')
+    parser.add_argument('--workers', default=f'1,{cores}', help="Worker counts to try")
+    parser.add_argument('--threads', default=','.join(str(t) for t in sorted({1, 2, cores})),
+                        help="Threads per worker to try")
+    parser.add_argument('--duration', type=float, default=5, help="Measured seconds per config")
+    parser.add_argument('--warmup', type=float, default=5, help="Seconds allowed for workers to load")
+    parser.add_argument('--model', help="Path to like_predictor.pkl")
+    parser.add_argument('--json', help="Write results to this file")
+    # Internal: worker process mode
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--task', help=argparse.SUPPRESS)
+    parser.add_argument('--n-jobs', type=int, default=1, help=argparse.SUPPRESS)
+    parser.add_argument('--start-at', type=float, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        args.threads, args.workers = int(args.threads), int(args.workers)
+        run_worker(args)
+        return
+
+    model = ensure_model(args.model)
+    print(f"{cores} cores available")
+    print(f"\n{'task':<15}{'workers':>8}{'threads':>8}{'n_jobs':>8}{'total':>8}{'ops/s':>12}")
+    print("-" * 59)
+
+    results = []
+    skipped = set()
+    for task in args.tasks.split(','):
+        for workers, threads in itertools.product(parse_list(args.workers), parse_list(args.threads)):
+            # n_jobs only matters for the forest
+            for n_jobs in ([1] if task == 'ai' else sorted({1, threads})):
+                if task in skipped:
+                    continue
+                result = run_config(args, task, workers, threads, n_jobs, model)
+                if 'skipped' in result:
+                    print(f"{task:<15} skipped: {result['skipped']}")
+                    skipped.add(task)
+                    continue
+                results.append(result)
+                print(f"{task:<15}{workers:>8}{threads:>8}{n_jobs:>8}"
+                      f"{result['total_threads']:>8}{result['throughput_ops']:>12}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'cores': cores, 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
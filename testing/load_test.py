@@ -0,0 +1,372 @@
+"""
+Load test for the generator and like predictor APIs.
+
+Starts both Flask apps in this process (or targets already running ones),
+replays a weighted mix of requests across the routes and reports throughput,
+error rate and p50/p95/p99 latency per route.
+
+By default GPT-2 is replaced with a stub that sleeps for a fixed time, and a
+small synthetic like predictor is trained if like_predictor.pkl is missing,
+so the whole thing runs on a laptop with no network.
+
+Examples:
+    python testing/load_test.py --concurrency 16 --duration 30
+    python testing/load_test.py --rps 200 --mix generate=50,predict=50
+    python testing/load_test.py --real-gpt2 --json results.json
+    python testing/load_test.py --gateway --concurrency 16
+    python testing/load_test.py --generator-url http://localhost:5001 \\
+        --predictor-url http://localhost:5000
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import types
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MIX = {
+    'generate': 25,
+    'generate_branded': 15,
+    'generate_smart': 15,
+    'optimize_tweet': 10,
+    'generate_ai': 5,
+    'predict': 30,
+}
+
+COMPANIES = ['Nike', 'Tesla', 'Apple', 'Starbucks', 'SpaceX', 'Adidas', 'Microsoft']
+TOPICS = ['sports', 'electric vehicles', 'technology', 'coffee', 'space exploration']
+MESSAGES = ['launching new product', 'new seasonal drink', 'breakthrough in battery technology',
+            'successful rocket landing', 'new AI features']
+
+
+def make_payload(route):
+    """Build a random but realistic JSON body for a route."""
+    company = random.choice(COMPANIES)
+    topic = random.choice(TOPICS)
+    message = random.choice(MESSAGES)
+
+    if route == 'generate':
+        return {'company': company, 'message': message, 'topic': topic,
+                'tweet_type': random.choice(['general', 'announcement', 'question'])}
+    if route == 'generate_branded':
+        return {'company': company, 'message': message, 'topic': topic,
+                'industry': random.choice(['tech', 'food', 'fashion', 'fitness', 'finance']),
+                'brand_voice': random.choice(['casual', 'professional', 'playful'])}
+    if route == 'generate_smart':
+        return {'company': company, 'message': message, 'topic': topic,
+                'word_count_target': random.randint(10, 25),
+                'sentiment_target': round(random.uniform(-0.5, 0.9), 2),
+                'has_media': random.random() < 0.5,
+                'optimal_hour': random.randint(0, 23)}
+    if route == 'predict':
+        words = random.randint(5, 40)
+        return {'word_count': words, 'char_count': words * random.randint(4, 7),
+                'has_media': random.randint(0, 1), 'hour': random.randint(0, 23),
+                'sentiment': round(random.uniform(-1, 1), 2)}
+    # optimize_tweet and generate_ai share the same inputs
+    return {'company': company, 'message': message, 'topic': topic}
+
+
+def parse_mix(text):
+    """Parse 'generate=50,predict=50' into a route -> weight dict."""
+    if not text:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in text.split(','):
+        route, _, weight = part.partition('=')
+        route = route.strip().lstrip('/')
+        if route not in DEFAULT_MIX:
+            raise SystemExit(f"Unknown route '{route}'. Choose from: {', '.join(DEFAULT_MIX)}")
+        mix[route] = float(weight or 1)
+    return mix
+
+
+def install_stub_gpt2(latency_ms):
+    """Replace the GPT-2 generator module with one that just sleeps."""
+
+    class StubAITweetGenerator:
+        def generate_ai_tweet(self, prompt, max_length=60, assisted=None, max_time=None, return_details=False):
+            # Like GPT-2 with max_time: out of time means no complete sentence
+            latency = latency_ms / 1000.0
+            stopped = max_time is not None and max_time < latency
+            time.sleep(max(0.0, max_time) if stopped else latency)
+            tweet = "" if stopped else "Stub GPT-2 tweet for load testing."
+            if return_details:
+                return tweet, {'new_tokens': 0 if stopped else 8, 'stopped_at_deadline': stopped}
+            return tweet
+
+        def assist_stats(self):
+            return {'assistant_model': None, 'assisted_calls': 0}
+
+    module = types.ModuleType('genenerator_ai')
+    module.AITweetGenerator = StubAITweetGenerator
+    sys.modules['genenerator_ai'] = module
+
+
+def ensure_model(model_path):
+    """
+    Make sure like_predictor.pkl exists in the working directory the apps
+    load it from. Trains a small synthetic forest if there is no model.
+    """
+    workdir = tempfile.mkdtemp(prefix='load_test_')
+    target = os.path.join(workdir, 'like_predictor.pkl')
+
+    if model_path is None and os.path.exists('like_predictor.pkl'):
+        model_path = 'like_predictor.pkl'
+
+    if model_path:
+        os.symlink(os.path.abspath(model_path), target)
+    else:
+        import joblib
+        import numpy as np
+        from sklearn.ensemble import RandomForestRegressor
+
+        print("No like_predictor.pkl found, training a small synthetic model.")
+        rng = np.random.default_rng(0)
+        X = np.column_stack([
+            rng.integers(0, 2, 2000),      # has_media
+            rng.integers(10, 280, 2000),   # char_count
+            rng.integers(2, 50, 2000),     # word_count
+            rng.integers(0, 24, 2000),     # hour
+            rng.uniform(-1, 1, 2000),      # sentiment
+        ])
+        y = 100 * X[:, 0] + X[:, 2] * 5 + rng.normal(0, 20, 2000)
+        joblib.dump(RandomForestRegressor(n_estimators=20, max_depth=8).fit(X, y), target)
+
+    return workdir
+
+
+def serve(app):
+    """Serve a Flask app on a free local port in a background thread."""
+    from werkzeug.serving import make_server
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}", server
+
+
+def start_local_apps(args):
+    sys.path[:0] = [os.path.join(ROOT, 'api'), os.path.join(ROOT, 'tweet_generators')]
+    if not args.real_gpt2:
+        install_stub_gpt2(args.stub_ai_latency_ms)
+
+    os.chdir(ensure_model(args.model))
+
+    if getattr(args, 'gateway', False):
+        import gateway
+
+        url, server = serve(gateway.app)
+        return url, url, [server]
+
+    import generator_api
+    import like_predictor_api
+
+    generator_url, generator_server = serve(generator_api.app)
+    predictor_url, predictor_server = serve(like_predictor_api.app)
+    return generator_url, predictor_url, [generator_server, predictor_server]
+
+
+class Recorder:
+    """Thread-safe collection of per-route latencies and status codes."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def add(self, route, latency, status):
+        with self.lock:
+            self.latencies[route].append(latency)
+            self.statuses[route][status] += 1
+
+
+_local = threading.local()
+
+# Route -> the one payload sent every time (--identical), else random payloads
+fixed_payloads = {}
+
+
+def send(route, base_url, recorder, scheduled=None, timeout=30):
+    """Send one request, timing from its scheduled start when given."""
+    if not hasattr(_local, 'session'):
+        _local.session = requests.Session()
+
+    started = scheduled if scheduled is not None else time.perf_counter()
+    try:
+        response = _local.session.post(f"{base_url}/{route}", json=fixed_payloads.get(route) or make_payload(route),
+                                       timeout=timeout)
+        status = response.status_code
+    except requests.RequestException as e:
+        status = type(e).__name__
+    recorder.add(route, time.perf_counter() - started, status)
+
+
+def run_closed_loop(args, routes, weights, urls, recorder):
+    """Each worker sends its next request as soon as the previous one returns."""
+    deadline = time.perf_counter() + args.duration
+
+    def worker():
+        while time.perf_counter() < deadline:
+            route = random.choices(routes, weights)[0]
+            send(route, urls[route], recorder)
+
+    threads = [threading.Thread(target=worker) for _ in range(args.concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def run_open_loop(args, routes, weights, urls, recorder):
+    """
+    Send requests at a fixed rate regardless of how fast they complete.
+    Latency is measured from the scheduled send time so queueing on the
+    client side is not hidden.
+    """
+    interval = 1.0 / args.rps
+    total = int(args.rps * args.duration)
+    started = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=args.max_workers) as pool:
+        for i in range(total):
+            scheduled = started + i * interval
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            route = random.choices(routes, weights)[0]
+            pool.submit(send, route, urls[route], recorder, scheduled)
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(q / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(recorder, elapsed):
+    results = {}
+    for route, latencies in sorted(recorder.latencies.items()):
+        latencies = sorted(latencies)
+        statuses = recorder.statuses[route]
+        ok = sum(n for s, n in statuses.items() if isinstance(s, int) and 200 <= s < 300)
+        results[route] = {
+            'requests': len(latencies),
+            'throughput_rps': round(len(latencies) / elapsed, 2),
+            'error_rate': round(1 - ok / len(latencies), 4),
+            'shed': statuses.get(503, 0),
+            'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+            'statuses': {str(s): n for s, n in statuses.items()},
+        }
+    return results
+
+
+def print_table(results, elapsed):
+    print("\n" + "=" * 86)
+    print(f"{'route':<18}{'reqs':>8}{'rps':>10}{'err%':>8}{'shed':>7}"
+          f"{'p50 ms':>11}{'p95 ms':>11}{'p99 ms':>11}")
+    print("-" * 86)
+    for route, r in results.items():
+        print(f"{route:<18}{r['requests']:>8}{r['throughput_rps']:>10}"
+              f"{r['error_rate'] * 100:>8.2f}{r['shed']:>7}"
+              f"{r['p50_ms']:>11}{r['p95_ms']:>11}{r['p99_ms']:>11}")
+    print("-" * 86)
+    total = sum(r['requests'] for r in results.values())
+    print(f"{'total':<18}{total:>8}{round(total / elapsed, 2):>10}")
+    print("=" * 86)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mix', help="Route weights, e.g. 'generate=30,predict=70'")
+    parser.add_argument('--duration', type=float, default=10, help="Seconds to run for")
+    parser.add_argument('--concurrency', type=int, default=8, help="Closed-loop workers")
+    parser.add_argument('--rps', type=float, help="Target request rate (open loop)")
+    parser.add_argument('--max-workers', type=int, default=64, help="Thread cap for open loop mode")
+    parser.add_argument('--real-gpt2', action='store_true', help="Load the real GPT-2 model")
+    parser.add_argument('--stub-ai-latency-ms', type=float, default=300, help="Stub GPT-2 latency")
+    parser.add_argument('--model', help="Path to like_predictor.pkl")
+    parser.add_argument('--gateway', action='store_true', help="Serve both route sets from the unified gateway app")
+    parser.add_argument('--generator-url', help="Use a running generator API instead")
+    parser.add_argument('--predictor-url', help="Use a running like predictor API instead")
+    parser.add_argument('--identical', action='store_true',
+                        help="Send the same payload for every request to a route (thundering herd)")
+    parser.add_argument('--json', help="Write machine-readable results to this file")
+    args = parser.parse_args()
+
+    if args.json:
+        args.json = os.path.abspath(args.json)
+
+    mix = parse_mix(args.mix)
+    routes, weights = list(mix), list(mix.values())
+    if args.identical:
+        fixed_payloads.update({route: make_payload(route) for route in routes})
+
+    servers = []
+    if args.generator_url and args.predictor_url:
+        generator_url, predictor_url = args.generator_url.rstrip('/'), args.predictor_url.rstrip('/')
+    else:
+        generator_url, predictor_url, servers = start_local_apps(args)
+
+    urls = {route: predictor_url if route == 'predict' else generator_url for route in routes}
+    mode = f"{args.rps} rps (open loop)" if args.rps else f"{args.concurrency} workers (closed loop)"
+    print(f"Running {mode} for {args.duration}s against {generator_url} and {predictor_url}")
+
+    recorder = Recorder()
+    started = time.perf_counter()
+    if args.rps:
+        run_open_loop(args, routes, weights, urls, recorder)
+    else:
+        run_closed_loop(args, routes, weights, urls, recorder)
+    elapsed = time.perf_counter() - started
+
+    coalescing = {}
+    for url in {generator_url, predictor_url}:
+        try:
+            coalescing.update(requests.get(f"{url}/coalescing_stats", timeout=5).json())
+        except (requests.RequestException, ValueError):
+            pass
+
+    for server in servers:
+        server.shutdown()
+
+    results = summarize(recorder, elapsed)
+    print_table(results, elapsed)
+
+    if coalescing:
+        print("Coalesced identical requests:")
+        for route, stats in sorted(coalescing.items()):
+            print(f"  {route:<18} executed {stats['executed']:>6}  coalesced {stats['coalesced']:>6}"
+                  f"  ({stats['coalesced_ratio']:.1%})")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({
+                'mode': 'open' if args.rps else 'closed',
+                'rps_target': args.rps,
+                'concurrency': None if args.rps else args.concurrency,
+                'duration_s': round(elapsed, 2),
+                'mix': mix,
+                'stub_gpt2': not args.real_gpt2,
+                'identical_payloads': args.identical,
+                'routes': results,
+                'coalescing': coalescing,
+            }, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -116,6 +116,61 @@ print(f"  Tweet: {opt_result.get('tweet')}")
 if 'predicted_likes' in opt_result:
     print(f"  Predicted Likes: {opt_result['predicted_likes']}")
 
+# Test 7: Batch generation with mixed generators
+print("\n7. Testing Batch Generation (template + branded + smart)")
+print("-" * 60)
+batch_response = requests.post('http://localhost:5001/generate_batch', json={
+    'specs': [
+        {'kind': 'template', 'company': 'Nike', 'tweet_type': 'announcement',
+         'message': 'launching new product', 'topic': 'sports', 'has_media': True, 'hour': 14},
+        {'kind': 'branded', 'company': 'Starbucks', 'industry': 'food',
+         'brand_voice': 'playful', 'message': 'new seasonal drink', 'topic': 'Pumpkin Spice'},
+        {'kind': 'smart', 'company': 'Tesla', 'message': 'breakthrough in battery technology',
+         'topic': 'electric vehicles', 'sentiment_target': 0.7, 'has_media': True},
+        {'kind': 'unknown', 'company': 'Broken'}
+    ]
+})
+batch_result = batch_response.json()
+for item in batch_result.get('results', []):
+    if item['success']:
+        print(f"  [{item['index']}] {item['kind']}: {item['generated_tweet']}"
+              f" -> {item.get('predicted_likes')} likes")
+    else:
+        print(f"  [{item['index']}] error: {item['error']}")
+
+# Test 8: Near-duplicate filtering
+print("\n8. Testing Near-Duplicate Filtering (dedupe)")
+print("-" * 60)
+for i in range(5):
+    dedupe_result = requests.post('http://localhost:5001/generate', json={
+        'company': 'Adidas',
+        'tweet_type': 'announcement',
+        'message': 'dropping a new running shoe',
+        'dedupe': True
+    }).json()
+    print(f"  {dedupe_result['generated_tweet']} -> {dedupe_result['dedup']}")
+
+# Test 9: Scheduling a week of drafts for two brands
+print("\n9. Testing Posting Scheduler")
+print("-" * 60)
+schedule_result = requests.post('http://localhost:5001/schedule', json={
+    'drafts': [
+        {'text': 'Our new running shoe drops Friday! 👟', 'company': 'Nike', 'media_available': True},
+        {'text': 'Behind the scenes at our design lab', 'company': 'Nike'},
+        {'text': 'Members get early access this weekend ✨', 'company': 'Nike', 'media_available': True},
+        {'text': 'Pumpkin Spice is back! ☕', 'company': 'Starbucks', 'media_available': True},
+        {'text': 'Try our new oat milk latte today', 'company': 'Starbucks'}
+    ],
+    'days': 7,
+    'window': [8, 22],
+    'min_spacing_hours': 4,
+    'start_date': '2026-10-19'
+}).json()
+for entry in schedule_result.get('schedule', []):
+    print(f"  {entry['post_at']} {entry['company']}: {entry['text']}"
+          f" (media: {entry['has_media']}) -> {entry['predicted_likes']} likes")
+print(f"  Total predicted likes: {schedule_result.get('total_predicted_likes')}")
+
 print("\n" + "=" * 60)
 print("TESTING COMPLETE")
 print("=" * 60)
@@ -0,0 +1,95 @@
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'client'))
+from tweet_client import AsyncTweetClient, TweetClient, TweetClientError
+
+# Pass --local to serve both APIs in this process (stub GPT-2) instead of
+# using the ones running on localhost:5001 / localhost:5000.
+GENERATOR_URL = 'http://localhost:5001'
+PREDICTOR_URL = 'http://localhost:5000'
+
+if '--local' in sys.argv:
+    import argparse
+    import load_test
+
+    local_args = argparse.Namespace(real_gpt2=False, stub_ai_latency_ms=50, model=None)
+    GENERATOR_URL, PREDICTOR_URL, _servers = load_test.start_local_apps(local_args)
+
+print("=" * 60)
+print("TESTING PYTHON CLIENT")
+print("=" * 60)
+
+# Test 1: Plain pooled calls
+print("\n1. Single calls over one pooled session")
+print("-" * 60)
+with TweetClient(GENERATOR_URL, PREDICTOR_URL) as client:
+    print("  health:", client.health())
+    print("  generate:", client.generate('Nike', tweet_type='announcement', message='launching new product')['generated_tweet'])
+    print("  generate_smart:", client.generate_smart('Tesla', message='new battery', has_media=True)['tweet'])
+    print("  predict:", client.predict(word_count=15, char_count=120, has_media=1, hour=14, sentiment=0.8))
+    print("  predict_batch:", client.predict_batch([
+        {'word_count': 15, 'char_count': 120, 'has_media': 1, 'hour': 14, 'sentiment': 0.8},
+        {'word_count': 5, 'char_count': 40, 'has_media': 0, 'hour': 3, 'sentiment': -0.2},
+    ]))
+
+# Test 2: Auto-batching of concurrent single calls from threads
+print("\n2. Auto-batched calls from 8 threads")
+print("-" * 60)
+from concurrent.futures import ThreadPoolExecutor
+
+with TweetClient(GENERATOR_URL, PREDICTOR_URL, auto_batch=True) as client:
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        tweets = list(pool.map(lambda i: client.generate_branded(f'Company {i}', industry='food'), range(200)))
+        likes = list(pool.map(lambda i: client.predict(i % 40 + 1, 100, i % 2, i % 24, 0.5), range(200)))
+    elapsed = time.perf_counter() - started
+    print(f"  {len(tweets)} tweets and {len(likes)} predictions in {elapsed:.2f}s")
+    print(f"  example: {tweets[0]['generated_tweet']} -> {tweets[0].get('predicted_likes')} likes")
+
+# Test 3: asyncio client with auto-batching
+print("\n3. asyncio client, 500 concurrent smart generations")
+print("-" * 60)
+
+
+async def run_async():
+    async with AsyncTweetClient(GENERATOR_URL, PREDICTOR_URL, auto_batch=True) as client:
+        started = time.perf_counter()
+        results = await asyncio.gather(*(
+            client.generate_smart(f'Brand {i}', message='new seasonal drink', sentiment_target=0.7)
+            for i in range(500)
+        ))
+        print(f"  {len(results)} tweets in {time.perf_counter() - started:.2f}s")
+        print(f"  example: {results[0]['tweet']}")
+
+
+asyncio.run(run_async())
+
+# Test 4: Errors and retries
+print("\n4. Error handling")
+print("-" * 60)
+with TweetClient(GENERATOR_URL, PREDICTOR_URL) as client:
+    try:
+        client.predict_batch([{'word_count': 3}])
+    except TweetClientError as e:
+        print(f"  invalid features rejected: {e}")
+
+with TweetClient(GENERATOR_URL, PREDICTOR_URL, auto_batch=True, batch_window=0.05) as client:
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(client.predict, 15, 120, 1, 25 if i == 0 else 14, 0.5) for i in range(8)]
+    failed = [f.exception() for f in futures if f.exception() is not None]
+    print(f"  auto-batched calls with one bad row: {len(futures) - len(failed)} ok, "
+          f"{len(failed)} failed ({failed[0] if failed else '-'})")
+
+with TweetClient('http://127.0.0.1:9', PREDICTOR_URL, retries=2, backoff=0.05) as client:
+    started = time.perf_counter()
+    try:
+        client.health()
+    except TweetClientError as e:
+        print(f"  unreachable server gave up after retries ({time.perf_counter() - started:.2f}s): {e}")
+
+print("\n" + "=" * 60)
+print("CLIENT TESTING COMPLETE")
+print("=" * 60)
@@ -73,7 +73,7 @@ class AdvancedTweetGenerator:
             'question': ['🤔', '💭', '❓', '🗣️']
         }
     
-    def generate_branded_tweet(self, company, industry, brand_voice, message, topic=""):
+    def generate_branded_tweet(self, company, industry, brand_voice, message, topic="", rng=None):
         """
         Generate a tweet with specific brand voice and industry style.
         
@@ -83,14 +83,16 @@ class AdvancedTweetGenerator:
             brand_voice: Voice type (casual, professional, playful)
             message: Main message
             topic: Optional topic
+            rng: random.Random to draw from (default: the random module)
         
         Returns:
             Branded tweet string
         """
+        rng = rng or random
         # Get industry template
         industry = industry.lower()
         if industry in self.industry_templates:
-            template = random.choice(self.industry_templates[industry])
+            template = rng.choice(self.industry_templates[industry])
         else:
             template = "{message}"
         
@@ -118,7 +120,7 @@ class AdvancedTweetGenerator:
         return tweet
     
     def generate_smart_tweet(self, company, message, topic, word_count_target=15, 
-                           sentiment_target=0.5, has_media=False, optimal_hour=14):
+                           sentiment_target=0.5, has_media=False, optimal_hour=14, rng=None):
         """
         Generate a tweet optimized for maximum engagement using ML model insights.
         
@@ -130,10 +132,12 @@ class AdvancedTweetGenerator:
             sentiment_target: Target sentiment (-1 to 1, positive performs better)
             has_media: Whether media is included (increases engagement)
             optimal_hour: Suggested posting hour (14 = 2 PM, high engagement)
+            rng: random.Random to draw from (default: the random module)
         
         Returns:
             dict with 'tweet', 'predicted_features', 'tips'
         """
+        rng = rng or random
         # Select templates based on sentiment target
         if sentiment_target > 0.3:
             templates = self.positive_templates
@@ -146,7 +150,7 @@ class AdvancedTweetGenerator:
             emoji_set = self.emojis['neutral']
         
         # Generate initial tweet
-        template = random.choice(templates)
+        template = rng.choice(templates)
         tweet = template.format(company=company, message=message)
         
         # Add topic if relevant
@@ -167,7 +171,7 @@ class AdvancedTweetGenerator:
                 "Exciting times ahead!"
             ]
             if len(tweet) < 260:
-                tweet += " " + random.choice(additions)
+                tweet += " " + rng.choice(additions)
         elif current_words > word_count_target + 5:
             # Tweet is too long, trim it intelligently
             words = tweet.split()
@@ -179,13 +183,13 @@ class AdvancedTweetGenerator:
         
         # Add media indicators if has_media is True
         if has_media and len(tweet) < 270:
-            media_hints = random.choice(['📸', '🎥', '👀'])
+            media_hints = rng.choice(['📸', '🎥', '👀'])
             tweet += " " + media_hints
         
         # Add strategic emoji if sentiment is positive and not already present
         if sentiment_target > 0.5 and len(tweet) < 278:
             if not any(emoji in tweet for emoji in self.emojis['positive']):
-                tweet += " " + random.choice(emoji_set)
+                tweet += " " + rng.choice(emoji_set)
         
         # Calculate actual features
         actual_word_count = len(tweet.split())
@@ -0,0 +1,206 @@
+"""
+Near-duplicate detection for generated tweets.
+
+The template generators pick from small fixed pools, so bulk runs for one
+company repeat themselves. NearDuplicateIndex remembers the tweets issued
+per company as MinHash signatures over character shingles and finds
+similar ones through LSH band buckets, so a check costs a handful of
+small NumPy operations regardless of how many tweets were issued.
+
+Memory is fixed when the index is created: signatures live in a ring
+buffer of `capacity` slots (the oldest tweets are forgotten first) and
+each band has a fixed-size bucket table.
+"""
+import re
+import threading
+import zlib
+
+import numpy as np
+
+# Polynomial base for shingle hashes and band keys
+_BASE = np.uint64(1000003)
+
+_NON_WORD = re.compile(r'[^\w\s]+')
+_SPACES = re.compile(r'\s+')
+
+
+def normalize(text):
+    """Lowercase and drop punctuation/emoji so cosmetic variants compare equal."""
+    return _SPACES.sub(' ', _NON_WORD.sub(' ', text.lower())).strip()
+
+
+def company_key(company):
+    return zlib.crc32((company or '').strip().lower().encode('utf-8'))
+
+
+class NearDuplicateIndex:
+    """
+    Fixed-memory MinHash/LSH index of issued tweets, scoped per company.
+
+    Args:
+        capacity: tweets remembered before the oldest are overwritten
+        threshold: estimated Jaccard similarity at which two tweets count
+            as near-duplicates
+        num_perm: MinHash permutations per signature
+        bands: LSH bands; num_perm must be a multiple of it
+        shingle_size: characters per shingle
+        bucket_depth: slots kept per bucket before the oldest is replaced
+        seed: seed for the hash permutations
+    """
+
+    def __init__(self, capacity=200000, threshold=0.8, num_perm=32, bands=8,
+                 shingle_size=5, bucket_depth=4, seed=1):
+        if num_perm % bands:
+            raise ValueError('num_perm must be a multiple of bands')
+
+        self.capacity = capacity
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.bucket_depth = bucket_depth
+        self.n_buckets = max(1, capacity // 2)
+
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hashing: odd multipliers, top 32 bits of the product
+        self._mult = rng.integers(1, 2 ** 63, num_perm, dtype=np.uint64) | np.uint64(1)
+        self._add = rng.integers(0, 2 ** 63, num_perm, dtype=np.uint64)
+        self._powers = _BASE ** np.arange(shingle_size - 1, -1, -1, dtype=np.uint64)
+
+        # 16 bits per signature entry is plenty to estimate similarity
+        self._signatures = np.zeros((capacity, num_perm), dtype=np.uint16)
+        self._companies = np.zeros(capacity, dtype=np.uint32)
+        self._buckets = np.full((bands, self.n_buckets, bucket_depth), -1, dtype=np.int32)
+        self._cursors = np.zeros((bands, self.n_buckets), dtype=np.int32)
+        self._band_ids = np.arange(bands)
+
+        self._next = 0
+        self._lock = threading.Lock()
+        self.checks = 0
+        self.duplicates = 0
+
+    def __len__(self):
+        return min(self._next, self.capacity)
+
+    def signature(self, text):
+        """32-bit MinHash signature of a text's character shingles."""
+        data = np.frombuffer(normalize(text).encode('utf-8'), dtype=np.uint8).astype(np.uint64)
+        if len(data) >= self.shingle_size:
+            windows = np.lib.stride_tricks.sliding_window_view(data, self.shingle_size)
+            shingles = np.unique(windows @ self._powers)
+        else:
+            shingles = np.array([data @ self._powers[-len(data):] if len(data) else 0], dtype=np.uint64)
+
+        hashed = (self._mult[:, None] * shingles[None, :] + self._add[:, None]) >> np.uint64(32)
+        return hashed.min(axis=1)
+
+    def _bucket_ids(self, signature, company):
+        keys = np.full(self.bands, company, dtype=np.uint64)
+        for row in signature.reshape(self.bands, self.rows).T:
+            keys = keys * _BASE ^ row
+        return (keys % np.uint64(self.n_buckets)).astype(np.intp)
+
+    def _closest(self, signature, company, bucket_ids):
+        candidates = self._buckets[self._band_ids, bucket_ids].ravel()
+        candidates = np.unique(candidates[candidates >= 0])
+        candidates = candidates[self._companies[candidates] == company]
+        if not len(candidates):
+            return 0.0
+        short = signature.astype(np.uint16)
+        return float((self._signatures[candidates] == short).mean(axis=1).max())
+
+    def _insert(self, signature, company, bucket_ids):
+        slot = self._next % self.capacity
+        self._next += 1
+        self._signatures[slot] = signature.astype(np.uint16)
+        self._companies[slot] = company
+
+        positions = self._cursors[self._band_ids, bucket_ids]
+        self._buckets[self._band_ids, bucket_ids, positions] = slot
+        self._cursors[self._band_ids, bucket_ids] = (positions + 1) % self.bucket_depth
+
+    def similarity(self, text, company=None):
+        """Estimated Jaccard similarity to the closest tweet issued for `company`."""
+        signature = self.signature(text)
+        company = company_key(company)
+        with self._lock:
+            return self._closest(signature, company, self._bucket_ids(signature, company))
+
+    def is_duplicate(self, text, company=None):
+        return self.similarity(text, company) >= self.threshold
+
+    def add(self, text, company=None):
+        """Record a tweet as issued for `company`."""
+        signature = self.signature(text)
+        company = company_key(company)
+        with self._lock:
+            self._insert(signature, company, self._bucket_ids(signature, company))
+
+    def add_if_distinct(self, text, company=None):
+        """
+        Record a tweet unless it is a near-duplicate of one already issued.
+
+        Returns:
+            (added, similarity) where similarity is to the closest issued tweet
+        """
+        signature = self.signature(text)
+        company = company_key(company)
+        with self._lock:
+            bucket_ids = self._bucket_ids(signature, company)
+            similarity = self._closest(signature, company, bucket_ids)
+            self.checks += 1
+            if similarity >= self.threshold:
+                self.duplicates += 1
+                return False, similarity
+            self._insert(signature, company, bucket_ids)
+            return True, similarity
+
+    def clear(self):
+        with self._lock:
+            self._buckets.fill(-1)
+            self._cursors.fill(0)
+            self._next = 0
+
+    def stats(self):
+        return {
+            'entries': len(self),
+            'capacity': self.capacity,
+            'threshold': self.threshold,
+            'checks': self.checks,
+            'duplicates': self.duplicates,
+            'memory_mb': round(sum(a.nbytes for a in (
+                self._signatures, self._companies, self._buckets, self._cursors)) / 2 ** 20, 1),
+        }
+
+
+def generate_distinct(generate, index, company=None, max_attempts=5, text_of=None):
+    """
+    Call a generator until it produces a tweet that is not a near-duplicate
+    of one already issued for the company.
+
+    Args:
+        generate: no-argument callable returning a new candidate
+        index: NearDuplicateIndex the issued tweets are recorded in
+        company: company the tweet is issued for
+        max_attempts: candidates to try before giving up
+        text_of: maps a candidate to its tweet text (default: the candidate itself)
+
+    Returns:
+        (candidate, info) where info has attempts, similarity and
+        near_duplicate. If every attempt was a near-duplicate the least
+        similar candidate is returned and still recorded as issued.
+    """
+    text_of = text_of or (lambda candidate: candidate)
+    best, best_similarity = None, None
+
+    for attempt in range(1, max_attempts + 1):
+        candidate = generate()
+        added, similarity = index.add_if_distinct(text_of(candidate), company)
+        if added:
+            return candidate, {'attempts': attempt, 'similarity': round(similarity, 3), 'near_duplicate': False}
+        if best_similarity is None or similarity < best_similarity:
+            best, best_similarity = candidate, similarity
+
+    index.add(text_of(best), company)
+    return best, {'attempts': max_attempts, 'similarity': round(best_similarity, 3), 'near_duplicate': True}
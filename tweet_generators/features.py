@@ -0,0 +1,175 @@
+"""
+Columnar model features shared by the APIs and the Streamlit app.
+
+A FeatureBatch keeps the five like-predictor features as typed NumPy
+columns and always hands them to the model in the column order it was
+trained with in initialize.ipynb, so callers never assemble feature
+vectors by hand.
+"""
+import datetime
+import functools
+
+import numpy as np
+from textblob import TextBlob
+
+from intervals import DEFAULT_QUANTILES, forest_intervals, interval_records
+
+# Column order the like predictor was trained with in initialize.ipynb
+FEATURE_COLUMNS = ('has_media', 'char_count', 'word_count', 'hour', 'sentiment')
+
+DTYPES = {
+    'has_media': np.int8,
+    'char_count': np.int32,
+    'word_count': np.int32,
+    'hour': np.int8,
+    'sentiment': np.float64,
+}
+
+
+@functools.lru_cache(maxsize=65536)
+def polarity(text):
+    """
+    TextBlob polarity of a text.
+
+    Cached process-wide, so every API module and the Streamlit app loaded
+    into one process share the same sentiment cache.
+    """
+    return TextBlob(text).sentiment.polarity
+
+
+def sentiment_scores(texts):
+    """TextBlob polarity for every text."""
+    return np.fromiter(map(polarity, texts), dtype=DTYPES['sentiment'], count=len(texts))
+
+
+# Valid range of every column, checked before values are narrowed to DTYPES
+RANGES = {
+    'has_media': (0, 1),
+    'char_count': (0, np.iinfo(np.int32).max),
+    'word_count': (0, np.iinfo(np.int32).max),
+    'hour': (0, 23),
+    'sentiment': (-1.0, 1.0),
+}
+
+
+def _column(name, value, size):
+    try:
+        column = np.asarray(value, dtype=np.float64)
+    except (TypeError, ValueError):
+        raise ValueError(f"'{name}' must be a number.")
+    if np.isnan(column).any():
+        raise ValueError(f"'{name}' must be a number.")
+    low, high = RANGES[name]
+    if not np.all((column >= low) & (column <= high)):
+        raise ValueError(f"'{name}' must be between {low} and {high}.")
+
+    if column.ndim == 0:
+        return np.full(size, column, dtype=DTYPES[name])
+    if len(column) != size:
+        raise ValueError(f"Feature column has {len(column)} rows, expected {size}")
+    return column.astype(DTYPES[name])
+
+
+class FeatureBatch:
+    """
+    Struct-of-arrays holding the model features for a batch of tweets.
+
+    Every column may be given as a sequence or as a scalar, which is
+    broadcast to the batch size.
+    """
+
+    __slots__ = FEATURE_COLUMNS
+
+    def __init__(self, has_media, char_count, word_count, hour, sentiment):
+        values = dict(has_media=has_media, char_count=char_count, word_count=word_count,
+                      hour=hour, sentiment=sentiment)
+        sizes = {len(v) for v in values.values() if np.ndim(v) > 0}
+        if len(sizes) > 1:
+            raise ValueError(f"Feature columns have different lengths: {sorted(sizes)}")
+        size = sizes.pop() if sizes else 1
+
+        for name, value in values.items():
+            setattr(self, name, _column(name, value, size))
+
+    @classmethod
+    def from_texts(cls, texts, has_media=False, hour=None):
+        """
+        Extract features for many tweets at once.
+
+        Args:
+            texts: list of tweet texts
+            has_media: bool, or one bool per tweet
+            hour: posting hour, one hour per tweet, or None for the current hour
+        """
+        if hour is None:
+            hour = datetime.datetime.now().hour
+        size = len(texts)
+        return cls(
+            has_media=_column('has_media', has_media, size),
+            char_count=np.fromiter(map(len, texts), dtype=DTYPES['char_count'], count=size),
+            word_count=np.fromiter((len(t.split()) for t in texts), dtype=DTYPES['word_count'], count=size),
+            hour=_column('hour', hour, size),
+            sentiment=sentiment_scores(texts),
+        )
+
+    @classmethod
+    def from_records(cls, records):
+        """Build a batch from feature dicts, e.g. the smart generator's predicted_features."""
+        missing = [name for name in FEATURE_COLUMNS if any(name not in r for r in records)]
+        if missing:
+            raise ValueError(f"Missing features: {', '.join(missing)}")
+        return cls(**{name: [r[name] for r in records] for name in FEATURE_COLUMNS})
+
+    @classmethod
+    def concat(cls, batches):
+        return cls(**{
+            name: np.concatenate([getattr(b, name) for b in batches]) for name in FEATURE_COLUMNS
+        })
+
+    def __len__(self):
+        return len(self.sentiment)
+
+    def to_matrix(self):
+        """(n, 5) float matrix in training column order."""
+        matrix = np.empty((len(self), len(FEATURE_COLUMNS)), dtype=np.float64)
+        for i, name in enumerate(FEATURE_COLUMNS):
+            matrix[:, i] = getattr(self, name)
+        return matrix
+
+    def predict(self, model):
+        """Predicted likes for every row with a single model call."""
+        if len(self) == 0:
+            return np.empty(0)
+        return model.predict(self.to_matrix())
+
+    def predict_with_intervals(self, model, quantiles=DEFAULT_QUANTILES):
+        """
+        Predicted likes plus per-tree quantiles for every row.
+
+        Returns:
+            (predictions, intervals) where intervals is one dict of
+            quantiles per row, or None if the model has no per-tree outputs
+        """
+        forest = forest_intervals(model)
+        if forest is None or len(self) == 0:
+            return self.predict(model), None
+        predictions, bands = forest.predict(self.to_matrix(), quantiles)
+        return predictions, interval_records(bands, quantiles)
+
+    def columns(self):
+        """Column name -> array, e.g. for building a DataFrame."""
+        return {name: getattr(self, name) for name in FEATURE_COLUMNS}
+
+    def record(self, i, ndigits=2):
+        """Row i as a JSON-friendly dict; sentiment is rounded unless ndigits is None."""
+        sentiment = float(self.sentiment[i])
+        return {
+            'word_count': int(self.word_count[i]),
+            'char_count': int(self.char_count[i]),
+            'has_media': int(self.has_media[i]),
+            'hour': int(self.hour[i]),
+            'sentiment': sentiment if ndigits is None else round(sentiment, ndigits),
+        }
+
+    def records(self, ndigits=2):
+        return [self.record(i, ndigits) for i in range(len(self))]
@@ -1,36 +1,120 @@
 # bonus_ai_generator.py
-from transformers import GPT2LMHeadModel, GPT2Tokenizer
+from transformers import AutoModelForCausalLM, GPT2LMHeadModel, GPT2Tokenizer
+import os
+import threading
 import torch
 
 class AITweetGenerator:
-    def __init__(self):
-        self.tokenizer = GPT2Tokenizer.from_pretrained('gpt2')
-        self.model = GPT2LMHeadModel.from_pretrained('gpt2')
+    def __init__(self, assistant_model=None, model_dir=None):
+        """
+        Args:
+            assistant_model: optional smaller draft model sharing GPT-2's
+                tokenizer (e.g. 'distilgpt2'). When set, gpt2 verifies the
+                draft's proposed tokens in one forward pass (assisted
+                decoding). Defaults to the AI_ASSISTANT_MODEL env var; unset
+                or empty means plain decoding.
+            model_dir: local snapshot written by model&data/snapshot_gpt2.py.
+                It is loaded offline with the weights memory-mapped, so
+                worker processes share them. The assistant model, if any,
+                is then also loaded offline, from the snapshot when it
+                was saved there. Defaults to the AI_MODEL_DIR env var;
+                unset or empty loads gpt2 from the Hugging Face cache.
+        """
+        if model_dir is None:
+            model_dir = os.environ.get('AI_MODEL_DIR') or None
+        if assistant_model is None:
+            assistant_model = os.environ.get('AI_ASSISTANT_MODEL') or None
+        self.model_dir = model_dir
+        self.assistant_name = assistant_model
+
+        if model_dir:
+            from model_snapshot import load_snapshot
+            self.tokenizer, self.model, self.assistant = load_snapshot(model_dir, assistant_model)
+        else:
+            self.tokenizer = GPT2Tokenizer.from_pretrained('gpt2')
+            self.model = GPT2LMHeadModel.from_pretrained('gpt2')
+            self.assistant = AutoModelForCausalLM.from_pretrained(assistant_model) if assistant_model else None
         self.tokenizer.pad_token = self.tokenizer.eos_token
-    
-    def generate_ai_tweet(self, prompt, max_length=60):
+
+        # Forward passes of each model during assisted calls, counted per thread
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._stats = {'assisted_calls': 0, 'new_tokens': 0, 'target_forwards': 0, 'draft_forwards': 0}
+        if self.assistant is not None:
+            self.model.register_forward_hook(self._count_forward('target_forwards'))
+            self.assistant.register_forward_hook(self._count_forward('draft_forwards'))
+
+    def _count_forward(self, name):
+        def hook(module, inputs, output):
+            counts = getattr(self._local, 'counts', None)
+            if counts is not None:
+                counts[name] += 1
+        return hook
+
+    def generate_ai_tweet(self, prompt, max_length=60, assisted=None, max_time=None, return_details=False):
+        """
+        Args:
+            prompt: text GPT-2 continues
+            max_length: total token length including the prompt
+            assisted: use the draft model; None uses it whenever one is configured
+            max_time: seconds after which decoding stops; the tweet is then
+                cleaned up from whatever was generated so far
+            return_details: also return a dict with new_tokens and
+                stopped_at_deadline
+
+        Returns:
+            the tweet, or (tweet, details) with return_details
+        """
         inputs = self.tokenizer.encode(prompt, return_tensors='pt')
-        
-        with torch.no_grad():
-            outputs = self.model.generate(
-                inputs,
-                max_length=max_length,
-                temperature=0.9,
-                top_p=0.95,
-                do_sample=True,
-                pad_token_id=self.tokenizer.eos_token_id,
-                no_repeat_ngram_size=3
-            )
-        
+
+        if assisted is None:
+            assisted = self.assistant is not None
+        elif assisted and self.assistant is None:
+            raise ValueError('Assisted decoding needs an assistant model (AI_ASSISTANT_MODEL).')
+        extra = {'assistant_model': self.assistant} if assisted else {}
+        if max_time is not None:
+            extra['max_time'] = max(0.0, max_time)
+
+        self._local.counts = {'target_forwards': 0, 'draft_forwards': 0} if assisted else None
+        try:
+            with torch.no_grad():
+                outputs = self.model.generate(
+                    inputs,
+                    max_length=max_length,
+                    temperature=0.9,
+                    top_p=0.95,
+                    do_sample=True,
+                    pad_token_id=self.tokenizer.eos_token_id,
+                    no_repeat_ngram_size=3,
+                    **extra
+                )
+        finally:
+            counts, self._local.counts = self._local.counts, None
+
+        # Decoding ended before max_length without an end-of-text token: out of time
+        new_tokens = outputs.shape[1] - inputs.shape[1]
+        stopped_at_deadline = (
+            max_time is not None
+            and outputs.shape[1] < max_length
+            and outputs[0, -1].item() != self.tokenizer.eos_token_id
+        )
+
+        if assisted:
+            with self._stats_lock:
+                self._stats['assisted_calls'] += 1
+                self._stats['new_tokens'] += new_tokens
+                self._stats['target_forwards'] += counts['target_forwards']
+                self._stats['draft_forwards'] += counts['draft_forwards']
+
         generated_text = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
         tweet = generated_text[len(prompt):].strip()
-        
+
         # Clean up the tweet - remove URLs, mentions, and extra content
         # Stop at common delimiters
         for delimiter in ['\n', 'http', '@', '—', 'RT']:
             if delimiter in tweet:
                 tweet = tweet[:tweet.index(delimiter)]
-        
+
         # Remove incomplete sentences at the end
         tweet = tweet.strip()
         if tweet and not tweet[-1] in '.!?…':
@@ -40,7 +124,28 @@ class AITweetGenerator:
                 if last_idx > 0:
                     tweet = tweet[:last_idx + 1]
                     break
-        
-        return tweet[:280].strip()  # Twitter limit
 
-# Add this to your API as a bonus endpoint
\ No newline at end of file
+        tweet = tweet[:280].strip()  # Twitter limit
+        if return_details:
+            return tweet, {'new_tokens': int(new_tokens), 'stopped_at_deadline': bool(stopped_at_deadline)}
+        return tweet
+
+    def assist_stats(self):
+        """
+        Acceptance statistics of assisted decoding so far.
+
+        Each gpt2 forward pass verifies the draft's proposals and keeps the
+        accepted ones plus one token of its own, so accepted = new tokens -
+        gpt2 passes, out of one proposal per draft forward pass.
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        accepted = max(0, stats['new_tokens'] - stats['target_forwards'])
+        stats['assistant_model'] = self.assistant_name
+        stats['acceptance_rate'] = round(accepted / stats['draft_forwards'], 3) if stats['draft_forwards'] else None
+        stats['tokens_per_target_forward'] = (
+            round(stats['new_tokens'] / stats['target_forwards'], 2) if stats['target_forwards'] else None
+        )
+        return stats
+
+# Add this to your API as a bonus endpoint
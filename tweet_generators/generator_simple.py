@@ -46,10 +46,12 @@ class SimpleTweetGenerator:
             "{company} announces {message} for {topic}"
         ]
     
-    def generate_tweet(self, company, tweet_type="general", message="Something awesome!", topic="innovation"):
-        
+    def generate_tweet(self, company, tweet_type="general", message="Something awesome!", topic="innovation",
+                       rng=None):
+        # rng: random.Random to draw the template from, for reproducible drafts
+        rng = rng or random
         template_list = self.templates.get(tweet_type, self.templates['general'])
-        template = random.choice(template_list)
+        template = rng.choice(template_list)
         
         
         tweet = template.format(
@@ -0,0 +1,84 @@
+"""
+Prediction intervals from the like predictor's per-tree outputs.
+
+A random forest's prediction is the mean of its trees' predictions, so
+the spread of those per-tree predictions shows how much the model agrees
+with itself about a tweet. ForestIntervals gets every tree's prediction
+for every row from one model.apply() call and a gather from a flat array
+of all leaf values. The same pass gives both the point estimate and the
+quantiles, so an interval costs about as much as a plain predict().
+
+Models without per-tree outputs (e.g. the histogram gradient boosting
+candidates from compact_model.py) get no interval.
+"""
+import functools
+
+import numpy as np
+from sklearn.ensemble import ExtraTreesRegressor, RandomForestRegressor
+
+# Reported unless a request asks for others
+DEFAULT_QUANTILES = (0.1, 0.5, 0.9)
+MAX_QUANTILES = 9
+
+
+def validate_quantiles(quantiles):
+    """Return quantiles as a tuple of floats in [0, 1], or raise ValueError."""
+    if quantiles is None:
+        return DEFAULT_QUANTILES
+    if not isinstance(quantiles, (list, tuple)) or not 0 < len(quantiles) <= MAX_QUANTILES:
+        raise ValueError(f"'quantiles' must be a list of 1 to {MAX_QUANTILES} numbers.")
+    try:
+        quantiles = tuple(float(q) for q in quantiles)
+    except (TypeError, ValueError):
+        raise ValueError("'quantiles' must be numbers between 0 and 1.")
+    if not all(0 <= q <= 1 for q in quantiles):
+        raise ValueError("'quantiles' must be numbers between 0 and 1.")
+    return quantiles
+
+
+def quantile_key(q):
+    """0.1 -> 'p10', 0.025 -> 'p2.5'."""
+    return f"p{q * 100:g}"
+
+
+class ForestIntervals:
+    """Per-tree predictions of a fitted forest regressor, for whole batches at once."""
+
+    def __init__(self, model):
+        trees = [estimator.tree_ for estimator in model.estimators_]
+        self.model = model
+        self.n_trees = len(trees)
+        # Every tree's node values back to back; tree t starts at offsets[t]
+        sizes = np.array([tree.node_count for tree in trees])
+        self.offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.intp)
+        self.values = np.concatenate([tree.value[:, 0, 0] for tree in trees])
+
+    def tree_predictions(self, X):
+        """(n_rows, n_trees) prediction of every tree for every row."""
+        leaves = self.model.apply(X)
+        return self.values[leaves + self.offsets]
+
+    def predict(self, X, quantiles=DEFAULT_QUANTILES):
+        """
+        Point predictions and per-tree quantiles for every row.
+
+        Returns:
+            (predictions, bands) where predictions has shape (n_rows,) and
+            bands has shape (len(quantiles), n_rows)
+        """
+        per_tree = self.tree_predictions(X)
+        return per_tree.mean(axis=1), np.quantile(per_tree, quantiles, axis=1)
+
+
+@functools.lru_cache(maxsize=8)
+def forest_intervals(model):
+    """ForestIntervals for a forest model, or None if it has no per-tree outputs."""
+    if isinstance(model, (RandomForestRegressor, ExtraTreesRegressor)) and model.n_outputs_ == 1:
+        return ForestIntervals(model)
+    return None
+
+
+def interval_records(bands, quantiles):
+    """One {'p10': ..., 'p50': ..., 'p90': ...} dict of whole likes per row."""
+    keys = [quantile_key(q) for q in quantiles]
+    return [dict(zip(keys, (int(v) for v in column))) for column in bands.T]
@@ -0,0 +1,143 @@
+"""
+Zero-copy loading of a local GPT-2 snapshot.
+
+model&data/snapshot_gpt2.py writes the tokenizer, config and weights
+(model.safetensors) to a directory. load_snapshot() reads it without
+the hub: the safetensors file is memory-mapped and every weight tensor
+is a view into that mapping, so nothing is copied. Pages come straight
+from the OS page cache, and several worker processes loading the same
+snapshot share one physical copy of the weights.
+"""
+import contextlib
+import json
+import mmap
+import os
+import re
+import struct
+
+import torch
+from transformers import AutoConfig, AutoModelForCausalLM, AutoTokenizer
+
+WEIGHTS_FILE = 'model.safetensors'
+ASSISTANT_DIR = 'assistant'
+
+_DTYPES = {
+    'F64': torch.float64,
+    'F32': torch.float32,
+    'F16': torch.float16,
+    'BF16': torch.bfloat16,
+    'I64': torch.int64,
+    'I32': torch.int32,
+    'I16': torch.int16,
+    'I8': torch.int8,
+    'U8': torch.uint8,
+    'BOOL': torch.bool,
+}
+
+
+def load_mmap_state_dict(path):
+    """
+    Map a safetensors file and return its tensors as views into the mapping.
+
+    The mapping is private copy-on-write, so the tensors are writable
+    without touching the file, and untouched pages stay shared.
+    """
+    with open(path, 'rb') as f:
+        (header_size,) = struct.unpack('<Q', f.read(8))
+        header = json.loads(f.read(header_size))
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    base = 8 + header_size
+    state_dict = {}
+    for name, info in header.items():
+        if name == '__metadata__':
+            continue
+        dtype = _DTYPES[info['dtype']]
+        start, end = info['data_offsets']
+        count = (end - start) // torch.empty((), dtype=dtype).element_size()
+        if count == 0:
+            state_dict[name] = torch.empty(info['shape'], dtype=dtype)
+            continue
+        tensor = torch.frombuffer(mapping, dtype=dtype, count=count, offset=base + start)
+        state_dict[name] = tensor.view(info['shape'])
+    return state_dict
+
+
+def _no_init_weights():
+    """transformers' context manager that skips weight initialisation, wherever this version keeps it."""
+    try:
+        from transformers.modeling_utils import no_init_weights
+    except ImportError:
+        try:
+            from transformers.initialization import no_init_weights
+        except ImportError:
+            return contextlib.nullcontext()
+    return no_init_weights()
+
+
+def _check_loaded(model, result):
+    """
+    Raise unless every weight came from the snapshot.
+
+    The model was built without initialising its weights, so a parameter
+    the snapshot lacks would hold whatever memory it was given. Only an
+    output embedding tied to the loaded input embedding may be missing;
+    buffers (e.g. attention masks) are computed by the model itself.
+    """
+    ignored = getattr(model, '_keys_to_ignore_on_load_unexpected', None) or []
+    unexpected = [key for key in result.unexpected_keys
+                  if not any(re.search(pattern, key) for pattern in ignored)]
+
+    parameters = dict(model.named_parameters(remove_duplicate=False))
+    tied = model.get_input_embeddings().weight
+    missing = [key for key in result.missing_keys
+               if key in parameters and parameters[key] is not tied]
+
+    if missing or unexpected:
+        raise ValueError(
+            f"Snapshot does not match {type(model).__name__}: "
+            f"missing {missing[:5]}{'...' if len(missing) > 5 else ''}, "
+            f"unexpected {unexpected[:5]}{'...' if len(unexpected) > 5 else ''}"
+        )
+
+
+def load_model(model_dir):
+    """Causal LM from a snapshot directory with its weights memory-mapped."""
+    config = AutoConfig.from_pretrained(model_dir, local_files_only=True)
+    with _no_init_weights():
+        model = AutoModelForCausalLM.from_config(config)
+    state_dict = load_mmap_state_dict(os.path.join(model_dir, WEIGHTS_FILE))
+    # assign=True keeps the mapped tensors instead of copying into fresh ones
+    result = model.load_state_dict(state_dict, strict=False, assign=True)
+    # The output embedding is tied to the input one and not stored separately
+    model.tie_weights()
+    _check_loaded(model, result)
+    return model.eval()
+
+
+def load_snapshot(model_dir, assistant_model=None):
+    """
+    Tokenizer and model from a snapshot made by snapshot_gpt2.py, offline.
+
+    Args:
+        model_dir: snapshot directory
+        assistant_model: draft model for assisted decoding, or None for
+            none. Loaded memory-mapped from <model_dir>/assistant/<name>
+            when the snapshot has it, otherwise from the local Hugging
+            Face cache; never from the network.
+
+    Returns:
+        (tokenizer, model, assistant) where assistant is None without
+        assistant_model
+    """
+    tokenizer = AutoTokenizer.from_pretrained(model_dir, local_files_only=True)
+    model = load_model(model_dir)
+
+    assistant = None
+    if assistant_model:
+        assistant_dir = os.path.join(model_dir, ASSISTANT_DIR, assistant_model)
+        if os.path.isfile(os.path.join(assistant_dir, WEIGHTS_FILE)):
+            assistant = load_model(assistant_dir)
+        else:
+            assistant = AutoModelForCausalLM.from_pretrained(assistant_model, local_files_only=True).eval()
+    return tokenizer, model, assistant
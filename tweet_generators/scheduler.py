@@ -0,0 +1,215 @@
+"""
+Posting scheduler for many drafts across brands.
+
+Predicted likes for every draft at every hour of the day, with and
+without media, come from a single model call as an (N, 24, 2) tensor.
+Each brand's drafts are then assigned to hourly slots over the planning
+horizon to maximize total predicted likes, subject to the posting
+window, minimum spacing between a brand's posts, posts per hour and
+whether media is available for a draft.
+"""
+import datetime
+
+import numpy as np
+
+from features import FeatureBatch, sentiment_scores, DTYPES
+
+HOURS = 24
+METHODS = ('auto', 'greedy', 'hungarian')
+
+# Longest horizon and densest per-hour cap accepted. The hungarian cost
+# matrix is drafts x (days * 24 * posts per hour) per company, so these
+# bound the memory one request can take.
+MAX_DAYS = 31
+MAX_POSTS_PER_HOUR = 10
+
+
+def likes_tensor(texts, model):
+    """
+    Predicted likes for every text, hour and media choice in one model call.
+
+    Returns:
+        float array of shape (len(texts), 24, 2); the last axis is has_media
+    """
+    n = len(texts)
+    if n == 0:
+        return np.empty((0, HOURS, 2))
+
+    # Text features are computed once per draft and repeated for all 48 variants
+    repeat = HOURS * 2
+    char_count = np.fromiter(map(len, texts), dtype=DTYPES['char_count'], count=n)
+    word_count = np.fromiter((len(t.split()) for t in texts), dtype=DTYPES['word_count'], count=n)
+    batch = FeatureBatch(
+        has_media=np.tile([0, 1], n * HOURS),
+        char_count=np.repeat(char_count, repeat),
+        word_count=np.repeat(word_count, repeat),
+        hour=np.tile(np.repeat(np.arange(HOURS), 2), n),
+        sentiment=np.repeat(sentiment_scores(texts), repeat),
+    )
+    return batch.predict(model).reshape(n, HOURS, 2)
+
+
+def window_hours(window):
+    """
+    Boolean mask of allowed posting hours.
+
+    Args:
+        window: (start_hour, end_hour), two integers from 0 to 23, end
+            exclusive; wraps past midnight when start > end, e.g. (20, 2).
+            None allows every hour.
+
+    Raises:
+        ValueError: if window is not two hours from 0 to 23
+    """
+    allowed = np.zeros(HOURS, dtype=bool)
+    if window is None:
+        allowed[:] = True
+        return allowed
+    if not (isinstance(window, (list, tuple)) and len(window) == 2
+            and all(isinstance(h, int) and not isinstance(h, bool) and 0 <= h < HOURS for h in window)):
+        raise ValueError("'window' must be [start_hour, end_hour] with two integers from 0 to 23.")
+    start, end = window
+    if start < end:
+        allowed[start:end] = True
+    else:
+        allowed[start:] = True
+        allowed[:end] = True
+    return allowed
+
+
+def _hungarian_available():
+    try:
+        from scipy.optimize import linear_sum_assignment  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _assign_greedy(values, slot_hours, allowed, min_spacing, max_per_hour):
+    """
+    Let drafts pick their best feasible slot, most valuable drafts first.
+
+    Args:
+        values: (n, 24) best predicted likes per draft and hour
+        slot_hours: hour of day of every slot on the timeline
+        allowed: per-slot bool mask from the posting window
+
+    Returns:
+        slot index per draft, -1 where no slot was left
+    """
+    n, n_slots = len(values), len(slot_hours)
+    remaining = np.where(allowed, max_per_hour, 0)
+    blocked = np.zeros(n_slots, dtype=np.int32)
+    slots = np.full(n, -1)
+
+    for i in np.argsort(-values.max(axis=1), kind='stable'):
+        feasible = (remaining > 0) & (blocked == 0)
+        if not feasible.any():
+            break
+        scores = np.where(feasible, values[i, slot_hours], -np.inf)
+        slot = int(np.argmax(scores))
+        slots[i] = slot
+        remaining[slot] -= 1
+        if min_spacing > 1:
+            # No other post of this brand within min_spacing hours
+            blocked[max(0, slot - min_spacing + 1):slot + min_spacing] += 1
+    return slots
+
+
+def _assign_hungarian(values, slot_hours, allowed, max_per_hour):
+    """Optimal assignment when only the per-hour cap applies."""
+    from scipy.optimize import linear_sum_assignment
+
+    open_slots = np.repeat(np.flatnonzero(allowed), max_per_hour)
+    slots = np.full(len(values), -1)
+    if not len(open_slots):
+        return slots
+    rows, cols = linear_sum_assignment(values[:, slot_hours[open_slots]], maximize=True)
+    slots[rows] = open_slots[cols]
+    return slots
+
+
+def schedule_posts(drafts, model, days=7, window=None, min_spacing_hours=0,
+                   max_posts_per_hour=1, start_date=None, method='auto'):
+    """
+    Assign drafts to posting slots to maximize total predicted likes.
+
+    Args:
+        drafts: list of dicts with 'text', and optionally 'company' and
+            'media_available' (default False). Constraints apply per company.
+        model: like predictor
+        days: planning horizon in days (1 to MAX_DAYS); slots are hourly
+        window: allowed (start_hour, end_hour) each day, see window_hours
+        min_spacing_hours: minimum hours between two posts of one company
+        max_posts_per_hour: posts of one company allowed in the same hour
+            (1 to MAX_POSTS_PER_HOUR)
+        start_date: datetime.date of day 0, adds 'post_at' to each entry
+        method: 'greedy', 'hungarian' (optimal, needs scipy and spacing of
+            at most 1 hour) or 'auto'
+
+    Returns:
+        dict with 'schedule' (one entry per scheduled draft, in draft
+        order), 'unscheduled' (draft indices that did not fit),
+        'total_predicted_likes' and the 'method' used
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown method '{method}'. Use one of {', '.join(METHODS)}.")
+    if min_spacing_hours > 1 and method == 'hungarian':
+        raise ValueError("The hungarian method only supports min_spacing_hours of 0 or 1.")
+    if not 1 <= days <= MAX_DAYS:
+        raise ValueError(f"'days' must be between 1 and {MAX_DAYS}.")
+    if not 1 <= max_posts_per_hour <= MAX_POSTS_PER_HOUR:
+        raise ValueError(f"'max_posts_per_hour' must be between 1 and {MAX_POSTS_PER_HOUR}.")
+    allowed_hours = window_hours(window)
+
+    min_spacing = int(min_spacing_hours)
+    per_hour = 1 if min_spacing >= 1 else int(max_posts_per_hour)
+    if method == 'auto':
+        method = 'hungarian' if min_spacing <= 1 and _hungarian_available() else 'greedy'
+
+    texts = [d['text'] for d in drafts]
+    media = np.array([bool(d.get('media_available', False)) for d in drafts], dtype=bool)
+    tensor = likes_tensor(texts, model)
+
+    # Post with media whenever it is available and predicted to help
+    with_media = media[:, None] & (tensor[:, :, 1] > tensor[:, :, 0])
+    values = np.where(with_media, tensor[:, :, 1], tensor[:, :, 0])
+
+    slot_hours = np.tile(np.arange(HOURS), days)
+    allowed = np.tile(allowed_hours, days)
+
+    companies = {}
+    for i, d in enumerate(drafts):
+        companies.setdefault(d.get('company', ''), []).append(i)
+
+    slots = np.full(len(drafts), -1)
+    for rows in companies.values():
+        rows = np.array(rows)
+        if method == 'hungarian':
+            slots[rows] = _assign_hungarian(values[rows], slot_hours, allowed, per_hour)
+        else:
+            slots[rows] = _assign_greedy(values[rows], slot_hours, allowed, min_spacing, per_hour)
+
+    schedule = []
+    for i in np.flatnonzero(slots >= 0):
+        day, hour = divmod(int(slots[i]), HOURS)
+        entry = {
+            'index': int(i),
+            'company': drafts[i].get('company', ''),
+            'text': texts[i],
+            'day': day,
+            'hour': hour,
+            'has_media': bool(with_media[i, hour]),
+            'predicted_likes': int(values[i, hour]),
+        }
+        if start_date is not None:
+            entry['post_at'] = datetime.datetime.combine(
+                start_date + datetime.timedelta(days=day), datetime.time(hour)).isoformat()
+        schedule.append(entry)
+
+    return {
+        'schedule': schedule,
+        'unscheduled': [int(i) for i in np.flatnonzero(slots < 0)],
+        'total_predicted_likes': sum(e['predicted_likes'] for e in schedule),
+        'method': method,
+    }